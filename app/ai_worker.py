@@ -0,0 +1,218 @@
+import time
+import logging
+import threading
+from PyQt6.QtWidgets import QLabel, QProgressBar, QPushButton
+from PyQt6.QtCore import QObject, pyqtSignal
+
+logger = logging.getLogger()
+
+# Streamed tokens are forwarded to the GUI at most this often, to keep repaints cheap.
+STREAM_BATCH_SECONDS = 0.05
+
+class AiRequest(QObject):
+    """
+    One background AI call. The public signals are always emitted on the GUI
+    thread. HTTP calls cannot be interrupted mid-flight, so cancel() detaches
+    the request: its result is dropped when it arrives.
+    """
+    succeeded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    progress = pyqtSignal(str)  # batched text chunks from streaming requests
+    done = pyqtSignal()  # always emitted last: after success, failure or cancel
+    _result_ready = pyqtSignal(object)
+    _error = pyqtSignal(str)
+    _chunk_ready = pyqtSignal(str)
+
+    def __init__(self, label, parent=None):
+        super().__init__(parent)
+        self.label = label
+        self.cancelled = False
+        self._finished = False
+        # Queued onto this object's (GUI) thread when emitted by the worker.
+        self._result_ready.connect(self._deliver_result)
+        self._error.connect(self._deliver_error)
+        self._chunk_ready.connect(self._deliver_chunk)
+
+    def cancel(self):
+        if self._finished:
+            return
+        self.cancelled = True
+        logger.info(f"{self.label} cancelled by user.")
+        self._finish()
+
+    def _finish(self):
+        self._finished = True
+        self.done.emit()
+
+    def _run(self, fn, args, kwargs):
+        # Runs on the worker thread.
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"{self.label} failed: {e}", exc_info=True)
+            self._emit_safely(self._error, str(e))
+            return
+        self._emit_safely(self._result_ready, result)
+
+    def _run_stream(self, fn, args, kwargs):
+        # Runs on the worker thread. `fn` returns a generator of text chunks;
+        # unlike plain requests, a stream really stops when cancelled.
+        parts, batch = [], []
+        last_flush = time.monotonic()
+        try:
+            generator = fn(*args, **kwargs)
+            try:
+                for chunk in generator:
+                    if self.cancelled:
+                        return
+                    parts.append(chunk)
+                    batch.append(chunk)
+                    now = time.monotonic()
+                    if now - last_flush >= STREAM_BATCH_SECONDS:
+                        self._emit_safely(self._chunk_ready, ''.join(batch))
+                        batch.clear()
+                        last_flush = now
+            finally:
+                generator.close()
+        except Exception as e:
+            logger.error(f"{self.label} failed: {e}", exc_info=True)
+            self._emit_safely(self._error, str(e))
+            return
+        if batch:
+            self._emit_safely(self._chunk_ready, ''.join(batch))
+        self._emit_safely(self._result_ready, ''.join(parts))
+
+    def _emit_safely(self, signal, value):
+        # A cancelled request may already have been deleted by the runner.
+        try:
+            signal.emit(value)
+        except RuntimeError:
+            pass
+
+    def _deliver_result(self, result):
+        if self._finished:
+            logger.info(f"Discarding result of cancelled request: {self.label}.")
+            return
+        self.succeeded.emit(result)
+        self._finish()
+
+    def _deliver_chunk(self, text):
+        if not self._finished:
+            self.progress.emit(text)
+
+    def _deliver_error(self, message):
+        if self._finished:
+            return
+        self.failed.emit(message)
+        self._finish()
+
+
+class AiRequestRunner(QObject):
+    """
+    Runs AI calls in the background, at most `max_workers` at a time, and shows
+    their progress in the status bar. Calls run on daemon threads so that one
+    still waiting on the network never delays application exit.
+    """
+    def __init__(self, main_window, max_workers=4):
+        super().__init__(main_window)
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._closed = False
+        self._pending = []
+
+        status_bar = main_window.statusBar()
+        self._status_label = QLabel()
+        self._progress = QProgressBar()
+        self._progress.setRange(0, 0)  # indeterminate "busy" indicator
+        self._progress.setMaximumWidth(120)
+        self._cancel_button = QPushButton("Cancel")
+        self._cancel_button.clicked.connect(self.cancel_all)
+        for widget in (self._status_label, self._progress, self._cancel_button):
+            status_bar.addPermanentWidget(widget)
+        self._status_bar = status_bar
+        self._update_indicator()
+
+    def start(self, label, fn, *args, on_result=None, on_error=None, trigger=None, **kwargs):
+        """
+        Runs fn(*args, **kwargs) in the background and returns the AiRequest handle.
+        `trigger` (the button that started it) is disabled until the request is done.
+        """
+        request = AiRequest(label, self)
+        self._mark_pending(trigger, request)
+        if on_result:
+            request.succeeded.connect(on_result)
+        if on_error:
+            request.failed.connect(on_error)
+        request.done.connect(lambda r=request: self._on_done(r))
+        self._pending.append(request)
+        self._update_indicator()
+        logger.info(f"Started background request: {label}.")
+        self._submit(request._run, fn, args, kwargs)
+        return request
+
+    def start_stream(self, label, fn, *args, on_chunk=None, on_result=None, on_error=None, trigger=None, **kwargs):
+        """
+        Like start(), but `fn` returns a generator of text chunks. on_chunk receives
+        batched chunks as they arrive; on_result receives the full joined text.
+        """
+        request = AiRequest(label, self)
+        self._mark_pending(trigger, request)
+        if on_chunk:
+            request.progress.connect(on_chunk)
+        if on_result:
+            request.succeeded.connect(on_result)
+        if on_error:
+            request.failed.connect(on_error)
+        request.done.connect(lambda r=request: self._on_done(r))
+        self._pending.append(request)
+        self._update_indicator()
+        logger.info(f"Started streaming request: {label}.")
+        self._submit(request._run_stream, fn, args, kwargs)
+        return request
+
+    def _mark_pending(self, trigger, request):
+        # Re-clicks are ignored while the button is disabled, so a request is never sent twice.
+        if trigger is None:
+            return
+        original_text = trigger.text()
+        trigger.setEnabled(False)
+        trigger.setText(f"{original_text} (waiting...)")
+
+        def restore():
+            try:
+                trigger.setText(original_text)
+                trigger.setEnabled(True)
+            except RuntimeError:
+                pass  # button deleted while the request was pending
+        request.done.connect(restore)
+
+    def cancel_all(self):
+        for request in list(self._pending):
+            request.cancel()
+
+    def _submit(self, target, *args):
+        def run():
+            with self._slots:
+                if not self._closed:  # queued requests are dropped after shutdown
+                    target(*args)
+        threading.Thread(target=run, name='ai-request', daemon=True).start()
+
+    def shutdown(self):
+        self._closed = True
+        self.cancel_all()
+
+    def _on_done(self, request):
+        if request in self._pending:
+            self._pending.remove(request)
+        self._update_indicator()
+        request.deleteLater()
+
+    def _update_indicator(self):
+        busy = bool(self._pending)
+        for widget in (self._status_label, self._progress, self._cancel_button):
+            widget.setVisible(busy)
+        if busy:
+            labels = ", ".join(r.label for r in self._pending)
+            self._status_label.setText(f"Waiting for AI: {labels}")
+
+    def show_message(self, text, timeout_ms=4000):
+        self._status_bar.showMessage(text, timeout_ms)
@@ -1,12 +1,89 @@
 import logging
 from PyQt6.QtWidgets import QLineEdit, QTextEdit, QGroupBox
+from PyQt6.QtCore import Qt
+
+from resume_model import Personal, Resume, Section
 
 logger = logging.getLogger(__name__)
 
-def gather_data(main_window):
+def _widget_text(w):
+    return w.toPlainText().strip() if isinstance(w, QTextEdit) else w.text().strip()
+
+def _read_items(section_widget):
+    """
+    Reads every item group (job, degree, custom entry) of a list section. With
+    an item cache (SectionWidget.item_cache), groups that have not changed since
+    the last read reuse their entry dict and only edited groups are read again.
+    """
+    cache = getattr(section_widget, 'item_cache', None)
+    fresh_cache = {}
+    items, reread = [], 0
+    # Item groups sit in the section's own layouts, so they are its direct children;
+    # a recursive search would also visit every input inside every group.
+    for group in section_widget.findChildren(QGroupBox, options=Qt.FindChildOption.FindDirectChildrenOnly):
+        entry = cache.get(group) if cache is not None else None
+        if entry is None:
+            widgets = group.property("widgets")
+            if not widgets:
+                continue
+            entry = {key: _widget_text(w) for key, w in widgets.items()}
+            reread += 1
+        fresh_cache[group] = entry
+        items.append(entry)
+    if cache is not None:
+        # Rebuilt rather than updated, so removed groups drop out of the cache.
+        section_widget.item_cache = fresh_cache
+    # Entries of a lazily loaded section that have not been built yet follow the built ones.
+    items.extend(getattr(section_widget, 'pending_items', ()))
+    return items, reread
+
+def _read_section(section_widget):
+    sec_type = getattr(section_widget, 'section_type', None)
+    sec_title = getattr(section_widget, 'title', lambda: "Untitled")()
+    sec_data = {'type': sec_type, 'title': sec_title, 'content': None}
+
+    # --- Handle simple text-based sections ---
+    if sec_type in ['summary', 'skills', 'custom', 'custom_textarea']:
+        content_widget = section_widget.findChild(QTextEdit)
+        if content_widget:
+            text = content_widget.toPlainText().strip()
+            sec_data['content'] = text if text else ""
+            logger.debug(f"Collected text for section [{sec_title}]")
+
+    # --- Handle sections made of item groups: jobs, degrees, custom field entries ---
+    elif sec_type in ['experience', 'education', 'custom_fields']:
+        items, reread = _read_items(section_widget)
+        sec_data['content'] = items
+        logger.debug(f"Collected {len(items)} {sec_type} entries from [{sec_title}] ({reread} re-read)")
+
+    # --- Fallback for unknown sections ---
+    else:
+        # Try to detect if there's a QTextEdit or QLineEdit anyway
+        text_widget = section_widget.findChild(QTextEdit) or section_widget.findChild(QLineEdit)
+        if text_widget:
+            sec_data['content'] = _widget_text(text_widget)
+            logger.warning(f"Handled unknown section [{sec_title}] of type '{sec_type}' as text content.")
+        else:
+            logger.warning(f"Skipped section [{sec_title}] (unrecognized type: {sec_type})")
+
+    return sec_data
+
+def _section_widgets(main_window):
+    layout = main_window.sections_layout
+    for i in range(layout.count()):
+        section_widget = layout.itemAt(i).widget()
+        if section_widget:
+            yield section_widget
+
+def gather_data(main_window, incremental=True):
     """
     Gathers all data from the UI in visual order and structures it
     for backend services (LaTeX rendering, AI suggestions, etc.)
+
+    With `incremental`, sections whose inputs have not changed since the last
+    call (see SectionWidget.mark_dirty) return their cached dict instead of
+    being read from their widgets again. Cached section dicts are shared
+    between calls, so callers must treat the result as read-only.
     """
 
     data = {
@@ -17,77 +94,41 @@ def gather_data(main_window):
         'sections': []
     }
 
-    layout = main_window.sections_layout
-    total_sections = layout.count()
-    logger.debug(f"Gathering data from {total_sections} sections...")
-
-    for i in range(total_sections):
-        section_widget = layout.itemAt(i).widget()
-        if not section_widget:
+    reused = 0
+    for section_widget in _section_widgets(main_window):
+        tracked = hasattr(section_widget, 'dirty')
+        # Sections not built yet (SectionWidget.defer) only have their cached data.
+        if tracked and (not section_widget.is_populated or (
+                incremental and not section_widget.dirty and section_widget.cached_data is not None)):
+            data['sections'].append(section_widget.cached_data)
+            reused += 1
             continue
 
-        sec_type = getattr(section_widget, 'section_type', None)
-        sec_title = getattr(section_widget, 'title', lambda: "Untitled")()
-        sec_data = {'type': sec_type, 'title': sec_title, 'content': None}
-
-        # --- Handle simple text-based sections ---
-        if sec_type in ['summary', 'skills', 'custom', 'custom_textarea']:
-            content_widget = section_widget.findChild(QTextEdit)
-            if content_widget:
-                text = content_widget.toPlainText().strip()
-                sec_data['content'] = text if text else ""
-                logger.debug(f"Collected text for section [{sec_title}]")
-
-        # --- Handle experience section (multiple jobs) ---
-        elif sec_type == 'experience':
-            jobs = []
-            for group in section_widget.findChildren(QGroupBox):
-                widgets = group.property("widgets")
-                if not widgets:
-                    continue
-                job_entry = {
-                    key: w.toPlainText().strip() if isinstance(w, QTextEdit) else w.text().strip()
-                    for key, w in widgets.items()
-                }
-                jobs.append(job_entry)
-            sec_data['content'] = jobs
-            logger.debug(f"Collected {len(jobs)} job entries from [{sec_title}]")
-
-        # --- Handle education section (multiple degrees) ---
-        elif sec_type == 'education':
-            degrees = []
-            for group in section_widget.findChildren(QGroupBox):
-                widgets = group.property("widgets")
-                if not widgets:
-                    continue
-                degree_entry = {key: w.text().strip() for key, w in widgets.items()}
-                degrees.append(degree_entry)
-            sec_data['content'] = degrees
-            logger.debug(f"Collected {len(degrees)} education entries from [{sec_title}]")
-
-        # --- Handle custom field-based sections (structured data) ---
-        elif sec_type == 'custom_fields':
-            items = []
-            for group in section_widget.findChildren(QGroupBox):
-                widgets = group.property("widgets")
-                if not widgets:
-                    continue
-                item_entry = {key: w.text().strip() for key, w in widgets.items()}
-                items.append(item_entry)
-            sec_data['content'] = items
-            logger.debug(f"Collected {len(items)} custom field entries from [{sec_title}]")
-
-        # --- Fallback for unknown sections ---
-        else:
-            # Try to detect if there's a QTextEdit or QLineEdit anyway
-            text_widget = section_widget.findChild(QTextEdit) or section_widget.findChild(QLineEdit)
-            if text_widget:
-                sec_data['content'] = text_widget.toPlainText().strip() if isinstance(text_widget, QTextEdit) else text_widget.text().strip()
-                logger.warning(f"Handled unknown section [{sec_title}] of type '{sec_type}' as text content.")
-            else:
-                logger.warning(f"Skipped section [{sec_title}] (unrecognized type: {sec_type})")
-
+        if not incremental and tracked:
+            section_widget.item_cache = {}
+        sec_data = _read_section(section_widget)
+        if tracked:
+            section_widget.cached_data = sec_data
+            section_widget.cached_model = None
+            section_widget.dirty = False
         data['sections'].append(sec_data)
 
-    logger.info(f"Successfully gathered {len(data['sections'])} sections from UI.")
+    logger.info(f"Successfully gathered {len(data['sections'])} sections from UI ({reused} unchanged).")
     return data
+
+def gather_resume(main_window):
+    """
+    Like gather_data, but returns a resume_model.Resume. Unchanged sections reuse
+    their Section object, and with it the content digest the ATS scorer caches by.
+    """
+    data = gather_data(main_window)
+    sections = []
+    for section_widget, sec_data in zip(_section_widgets(main_window), data['sections']):
+        model = getattr(section_widget, 'cached_model', None)
+        if model is None:
+            model = Section.from_dict(sec_data)
+            if hasattr(section_widget, 'cached_model'):
+                section_widget.cached_model = model
+        sections.append(model)
+    personal = Personal(data['name'], data['email'], data['phone'], data['linkedin'])
+    return Resume(personal, tuple(sections))
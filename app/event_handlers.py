@@ -3,22 +3,28 @@ import time
 import json
 import re
 import logging
-from PyQt6.QtWidgets import QMessageBox, QInputDialog
-from PyQt6.QtCore import QUrl
+from PyQt6.QtWidgets import QMessageBox, QInputDialog, QApplication, QGroupBox, QFileDialog
+from PyQt6.QtCore import QUrl, Qt
+from PyQt6.QtGui import QTextCursor
 
 # Imports for services now in the parent directory
 from latex_service import generate_latex_resume
-from openrouter_service import get_targeted_ai_suggestion, get_ats_score_and_feedback
+from ats_engine import score_resume
+from project_store import save_project, load_project, PROJECT_EXTENSION
+from openrouter_service import (
+    get_targeted_ai_suggestion, get_ats_score_and_feedback, clean_suggestion_text, get_batch_experience_rewrites
+)
 
 # Imports for modules now within the same 'app' package
 from app.ui_components import ATSResultsDialog
-from app.data_handler import gather_data
+from app.data_handler import gather_data, gather_resume
 
 logger = logging.getLogger()
 
 class EventHandlers:
     def __init__(self, main_window):
         self.win = main_window
+        self._last_preview_job_id = 0
 
     def schedule_preview_update(self, *args, **kwargs):
         self.win.preview_timer.start()
@@ -27,7 +33,36 @@ class EventHandlers:
         logger.info("User paused typing. Updating live preview...")
         resume_data = gather_data(self.win)
         template_name = self.win.template_combo.currentText()
-        pdf_path = generate_latex_resume(resume_data, template_name, is_preview=True)
+        # Compile off the GUI thread; on_preview_ready receives the result.
+        self.win.preview_compiler.submit(resume_data, template_name)
+        self.update_live_ats_score()
+
+    def schedule_ats_update(self, *args, **kwargs):
+        self.win.ats_timer.start()
+
+    def update_live_ats_score(self):
+        """Re-scores the resume locally; unchanged sections come from the scorer's cache."""
+        if not self.win.ats_group.isVisible():
+            return
+        job_description = self.win.job_description_input.toPlainText()
+        if not job_description.strip():
+            self.win.live_ats_label.setText("Live ATS score: paste a job description.")
+            return
+        result = score_resume(job_description, gather_resume(self.win))
+        missing = ", ".join(result['missing_keywords'][:5])
+        self.win.live_ats_label.setText(
+            f"Live ATS score: {result['score']}/100" + (f" (missing: {missing})" if missing else "")
+        )
+
+    def on_preview_ready(self, job_id, pdf_path):
+        # A slower, older job may finish after a newer one has been shown.
+        if job_id < self._last_preview_job_id:
+            logger.debug(f"Ignoring out-of-date preview result #{job_id}.")
+            return
+        # Superseded jobs are cancelled mid-compile; that is not a failure.
+        if not pdf_path and job_id < self.win.preview_compiler.latest_job_id:
+            return
+        self._last_preview_job_id = job_id
         if pdf_path:
             qurl = QUrl.fromLocalFile(os.path.abspath(pdf_path))
             qurl.setQuery(f"cache_buster={int(time.time())}")
@@ -48,6 +83,37 @@ class EventHandlers:
             QMessageBox.critical(self.win, "PDF Generation Failed", "Check 'Application Logs' for details.")
             self.win.right_tabs.setCurrentIndex(1)
             
+    def save_project_file(self):
+        """Saves the resume to its project file, asking for a path the first time."""
+        path = self.win.project_path
+        if not path:
+            path, _ = QFileDialog.getSaveFileName(self.win, "Save Project", f"resume{PROJECT_EXTENSION}",
+                                                  f"Resume Projects (*{PROJECT_EXTENSION})")
+            if not path:
+                return
+            if not path.endswith(PROJECT_EXTENSION):
+                path += PROJECT_EXTENSION
+        if save_project(path, gather_data(self.win)):
+            self.win.project_path = path
+            self.win.statusBar().showMessage(f"Saved project to {path}", 5000)
+        else:
+            QMessageBox.critical(self.win, "Save Failed", "Check 'Application Logs' for details.")
+
+    def open_project_file(self, path=None):
+        if not path:
+            path, _ = QFileDialog.getOpenFileName(self.win, "Open Project", "",
+                                                  f"Resume Projects (*{PROJECT_EXTENSION})")
+            if not path:
+                return
+        data = load_project(path)
+        if data is None:
+            QMessageBox.critical(self.win, "Open Failed", f"Could not open {os.path.basename(path)}. Check 'Application Logs' for details.")
+            return
+        # Only the sections in view are built now; the rest follow as they are scrolled to.
+        self.win.ui.load_resume_data(data, lazy=True)
+        self.win.project_path = path
+        self.schedule_preview_update()
+
     def set_api_key(self):
         text, ok = QInputDialog.getText(self.win, "API Key", "Paste your OpenRouter.ai API Key:")
         if ok and text: self.win.api_key = text
@@ -67,7 +133,11 @@ class EventHandlers:
             section.deleteLater()
             self.schedule_preview_update()
 
-    def handle_targeted_ai_suggestion(self, field_type, target_widget, context_group=None):
+    def _regenerate_requested(self):
+        # Shift+click on an AI button bypasses the response cache.
+        return bool(QApplication.keyboardModifiers() & Qt.KeyboardModifier.ShiftModifier)
+
+    def handle_targeted_ai_suggestion(self, field_type, target_widget, context_group=None, trigger=None):
         if not self.win.api_key or not self.win.job_role_input.text():
             QMessageBox.warning(self.win, "Input Missing", "Please set API Key and Target Job Title.")
             return
@@ -78,37 +148,147 @@ class EventHandlers:
             widgets = context_group.property("widgets")
             job_context = {"title": widgets['title'].text(), "company": widgets['company'].text()}
 
-        suggestion = get_targeted_ai_suggestion(self.win.api_key, self.win.job_role_input.text(), full_resume_data, field_type, job_context)
+        use_cache = not self._regenerate_requested()
+        original_text = target_widget.toPlainText()
+        state = {'streaming': False, 'applied': False}
+
+        def on_chunk(text):
+            try:
+                if not state['streaming']:
+                    state['streaming'] = True
+                    target_widget.clear()
+                target_widget.moveCursor(QTextCursor.MoveOperation.End)
+                target_widget.insertPlainText(text)
+            except RuntimeError:
+                pass  # field deleted while streaming
+
+        def on_result(text):
+            state['applied'] = True
+            self._apply_ai_suggestion(clean_suggestion_text(text), target_widget)
 
+        def on_done():
+            # Cancelled or failed mid-stream: put the user's text back.
+            if state['streaming'] and not state['applied']:
+                try:
+                    target_widget.setPlainText(original_text)
+                except RuntimeError:
+                    pass
+
+        request = self.win.ai_runner.start_stream(
+            "AI suggestion", get_targeted_ai_suggestion,
+            self.win.api_key, self.win.job_role_input.text(), full_resume_data, field_type, job_context,
+            use_cache=use_cache, stream=True,
+            on_chunk=on_chunk, on_result=on_result, on_error=self._show_ai_error, trigger=trigger
+        )
+        request.done.connect(on_done)
+
+    def _apply_ai_suggestion(self, suggestion, target_widget):
         if suggestion.startswith("Error:"):
             QMessageBox.critical(self.win, "AI Error", f"Could not get suggestion.\n\n{suggestion}")
-        else:
+            return
+        try:
             target_widget.setText(suggestion)
-            QMessageBox.information(self.win, "Success", "AI suggestion applied.")
+        except RuntimeError:
+            # The field was deleted while the request was pending.
+            logger.warning("Target field no longer exists; AI suggestion discarded.")
+            return
+        self.win.ai_runner.show_message("AI suggestion applied.")
+
+    def handle_rewrite_all_jobs(self, section, trigger=None):
+        if not self.win.api_key or not self.win.job_role_input.text():
+            QMessageBox.warning(self.win, "Input Missing", "Please set API Key and Target Job Title.")
+            return
+        section.ensure_populated()
+        job_groups = [g for g in section.findChildren(QGroupBox) if g.property("widgets")]
+        jobs = [
+            {key: w.toPlainText().strip() if key == 'description' else w.text().strip()
+             for key, w in g.property("widgets").items()}
+            for g in job_groups
+        ]
+        if not jobs:
+            QMessageBox.warning(self.win, "No Jobs", "Add at least one job before rewriting.")
+            return
+
+        full_resume_data = gather_data(self.win)
+        self.win.ai_runner.start(
+            f"Rewrite of {len(jobs)} job(s)", get_batch_experience_rewrites,
+            self.win.api_key, self.win.job_role_input.text(), full_resume_data, jobs,
+            use_cache=not self._regenerate_requested(),
+            on_result=lambda result: self._apply_batch_rewrites(result, job_groups),
+            on_error=self._show_ai_error, trigger=trigger
+        )
+
+    def _apply_batch_rewrites(self, result, job_groups):
+        if isinstance(result, str):
+            QMessageBox.critical(self.win, "AI Error", f"Could not rewrite the job descriptions.\n\n{result}")
+            return
+        applied = 0
+        for group, description in zip(job_groups, result):
+            try:
+                group.property("widgets")['description'].setPlainText(description)
+                applied += 1
+            except RuntimeError:
+                continue  # job removed while the request was pending
+        self.win.ai_runner.show_message(f"AI rewrote {applied} job description(s).")
+
+    def _show_ai_error(self, message):
+        QMessageBox.critical(self.win, "AI Error", f"The AI request failed.\n\n{message}")
+        self.win.right_tabs.setCurrentIndex(1)
 
     def handle_ats_check(self):
         logger.info("'Check ATS Score' button clicked.")
-        if not self.win.api_key:
-            QMessageBox.warning(self.win, "API Key Missing", "Please set your OpenRouter API key first.")
-            return
         job_description = self.win.job_description_input.toPlainText()
         if not job_description:
             QMessageBox.warning(self.win, "Input Missing", "Please paste the target job description.")
             return
-            
+
         resume_data = gather_data(self.win)
-        QMessageBox.information(self.win, "AI Request", "Analyzing resume... This may take a moment.")
-        
-        response_raw = get_ats_score_and_feedback(self.win.api_key, job_description, resume_data)
-        
+        # The score itself is computed locally and instantly; AI feedback is opt-in from the dialog.
+        result = score_resume(job_description, resume_data)
+        request_feedback = None
+        if self.win.api_key:
+            request_feedback = lambda: self._request_ats_feedback(dialog, job_description, resume_data)
+        dialog = ATSResultsDialog(result, self.win, request_feedback=request_feedback)
+        dialog.exec()
+
+    def _request_ats_feedback(self, dialog, job_description, resume_data):
+        self.win.ai_runner.start(
+            "ATS feedback", get_ats_score_and_feedback,
+            self.win.api_key, job_description, resume_data,
+            use_cache=not self._regenerate_requested(),
+            on_result=lambda response_raw: self._show_ats_result(dialog, response_raw),
+            on_error=lambda message: self._show_ats_error(dialog, message)
+        )
+
+    def _show_ats_result(self, dialog, response_raw):
+        if response_raw.startswith("Error"):
+            self._show_ats_error(dialog, response_raw)
+            return
         try:
-            match = re.search(r'\{.*\}', response_raw, re.DOTALL)
-            if not match: raise json.JSONDecodeError("No JSON object found.", response_raw, 0)
+            # Successful calls return the chat-completions envelope; the analysis is in the message.
+            content = response_raw
+            envelope = json.loads(response_raw)
+            if isinstance(envelope, dict) and envelope.get('choices'):
+                content = envelope['choices'][0]['message']['content']
+        except (json.JSONDecodeError, KeyError, IndexError, TypeError):
+            pass
+
+        try:
+            match = re.search(r'\{.*\}', content, re.DOTALL)
+            if not match: raise json.JSONDecodeError("No JSON object found.", content, 0)
             data = json.loads(match.group(0))
             if "error" in data: raise Exception(data["error"])
-            dialog = ATSResultsDialog(data, self.win)
-            dialog.exec()
         except Exception as e:
             logger.error(f"Failed to parse ATS response: {e}\nRaw response:\n{response_raw}")
-            QMessageBox.critical(self.win, "AI Error", "Could not parse the AI's response. Check logs.")
-            self.win.right_tabs.setCurrentIndex(1)
\ No newline at end of file
+            self._show_ats_error(dialog, "Could not parse the AI's response. Check logs.")
+            return
+        try:
+            dialog.show_ai_feedback(data)
+        except RuntimeError:
+            logger.info("ATS dialog was closed before the AI feedback arrived.")
+
+    def _show_ats_error(self, dialog, message):
+        try:
+            dialog.show_ai_error(message)
+        except RuntimeError:
+            logger.info(f"ATS dialog was closed before the AI request failed: {message}")
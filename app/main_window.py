@@ -6,18 +6,26 @@ from PyQt6.QtWebEngineWidgets import QWebEngineView
 # Updated imports to reflect the new location within the 'app' package
 from .ui_layout import UILayout
 from .event_handlers import EventHandlers
+from .preview_worker import PreviewCompiler
+from .ai_worker import AiRequestRunner
 from logger_setup import setup_logging # Import logger setup
+from openrouter_service import shutdown_openrouter
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, project_path=None):
         super().__init__()
         self.setWindowTitle("AI Resume Builder")
         self.setGeometry(100, 100, 1600, 900)
         self.api_key = None
+        self.project_path = None
         
         self.preview_timer = QTimer(self)
         self.preview_timer.setSingleShot(True)
         self.preview_timer.setInterval(1500)
+        # Local ATS scoring is cheap, so edits to the job description re-score sooner.
+        self.ats_timer = QTimer(self)
+        self.ats_timer.setSingleShot(True)
+        self.ats_timer.setInterval(300)
         
         # --- Right Pane Setup ---
         self.right_tabs = QTabWidget()
@@ -67,12 +75,26 @@ class MainWindow(QMainWindow):
         self.handlers = EventHandlers(self)
         self.ui = UILayout(self, self.handlers)
 
+        self.ai_runner = AiRequestRunner(self)
+        self.preview_compiler = PreviewCompiler(self)
+        self.preview_compiler.preview_ready.connect(self.handlers.on_preview_ready)
+
         self.reload_button.clicked.connect(self.handlers.update_live_preview) # Reload regenerates preview
         self.preview_timer.timeout.connect(self.handlers.update_live_preview)
+        self.ats_timer.timeout.connect(self.handlers.update_live_ats_score)
+
+        if project_path:
+            self.handlers.open_project_file(project_path)
+        if not self.project_path:
+            self.ui.add_section("summary")
+            self.ui.add_section("experience")
+            self.ui.add_section("education")
+            self.ui.add_section("skills")
 
-        self.ui.add_section("summary")
-        self.ui.add_section("experience")
-        self.ui.add_section("education")
-        self.ui.add_section("skills")
+        self.handlers.schedule_preview_update()
 
-        self.handlers.schedule_preview_update()
\ No newline at end of file
+    def closeEvent(self, event):
+        self.ai_runner.shutdown()
+        shutdown_openrouter()
+        self.preview_compiler.shutdown()
+        super().closeEvent(event)
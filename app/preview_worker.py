@@ -0,0 +1,78 @@
+import threading
+import logging
+from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+from latex_service import generate_latex_resume, cancel_preview
+
+logger = logging.getLogger()
+
+class _CompileWorker(QObject):
+    """Lives on the compile thread and builds whichever preview job is newest."""
+    finished = pyqtSignal(int, object)  # job_id, pdf path (or None on failure)
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._pending = None
+
+    def set_pending(self, job):
+        """Replaces any queued job; a stale snapshot is never compiled."""
+        with self._lock:
+            dropped = self._pending
+            self._pending = job
+        if dropped is not None:
+            logger.debug(f"Dropped stale preview job #{dropped[0]}.")
+
+    @pyqtSlot()
+    def process(self):
+        while True:
+            with self._lock:
+                job = self._pending
+                self._pending = None
+            if job is None:
+                return
+            job_id, data, template_name = job
+            pdf_path = generate_latex_resume(data, template_name, is_preview=True)
+            self.finished.emit(job_id, pdf_path)
+
+
+class PreviewCompiler(QObject):
+    """
+    Runs preview compiles on a dedicated QThread with latest-wins coalescing.
+    Call submit() from the GUI thread; preview_ready fires with the PDF path.
+    """
+    preview_ready = pyqtSignal(int, object)  # job_id, pdf path (or None on failure)
+    _wake = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._next_job_id = 0
+        self._thread = QThread()
+        self._thread.setObjectName("PreviewCompileThread")
+        self._worker = _CompileWorker()
+        self._worker.moveToThread(self._thread)
+        self._wake.connect(self._worker.process)
+        self._worker.finished.connect(self.preview_ready)
+        self._thread.start()
+
+    def submit(self, data, template_name):
+        """Queues a preview build of `data` and returns its job id."""
+        self._next_job_id += 1
+        # The compile currently running is now outdated; stop it instead of waiting.
+        # Cancel before queueing: the other way round, the worker could pick up the
+        # new job in between and this cancel would kill the newest preview.
+        cancel_preview()
+        self._worker.set_pending((self._next_job_id, data, template_name))
+        self._wake.emit()
+        return self._next_job_id
+
+    @property
+    def latest_job_id(self):
+        return self._next_job_id
+
+    def shutdown(self):
+        """Discards queued work, kills the running compile and stops the thread."""
+        self._worker.set_pending(None)
+        cancel_preview()
+        self._thread.quit()
+        self._thread.wait()
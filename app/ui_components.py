@@ -5,6 +5,9 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 
+# Sections loaded lazily build this many list entries (jobs, degrees) at a time.
+LAZY_ITEMS_PER_BATCH = 20
+
 class SectionWidget(QGroupBox):
     """A self-contained, re-orderable section widget for the UI."""
     def __init__(self, title, section_type, parent=None):
@@ -32,6 +35,96 @@ class SectionWidget(QGroupBox):
         self.main_layout.addLayout(control_layout)
         self.main_layout.addLayout(self.content_layout)
 
+        # Incremental gathering (see app.data_handler.gather_data): inputs registered
+        # with watch() mark the section, and the item group they sit in, as changed.
+        self.dirty = True
+        self.cached_data = None     # last gathered section dict; replaced, never mutated
+        self.cached_model = None    # resume_model.Section built from cached_data
+        self.item_cache = {}        # item QGroupBox -> last gathered entry dict
+        # Lazily built sections (see defer()) create their inputs as they scroll into view.
+        self._populate = None      # builds the section's inputs
+        self._add_item = None      # builds one list entry (defer_items())
+        self.pending_items = []    # list entries not built yet; gather_data appends them
+        self._placeholder = None   # "Show ..." button where building continues
+
+    @property
+    def is_populated(self):
+        return self._populate is None
+
+    @property
+    def lazy_anchor(self):
+        """The placeholder marking content not built yet, or None once everything is built."""
+        return self._placeholder
+
+    def defer(self, sec_data, populate):
+        """
+        Shows a placeholder instead of the section's inputs until populate_next()
+        calls `populate`. Until then gather_data serves `sec_data` as this section's data.
+        """
+        self._populate = populate
+        self.cached_data = sec_data
+        self.cached_model = None
+        self.dirty = False
+        content = sec_data.get('content')
+        label = f"Show {len(content)} entries" if isinstance(content, list) else "Show content"
+        self._set_placeholder(label, self.content_layout.count())
+
+    def defer_items(self, item_layout, items, add_item):
+        """
+        Builds the entries of a list section LAZY_ITEMS_PER_BATCH at a time:
+        `add_item(entry)` is called for the first batch now and for later ones
+        as the placeholder below `item_layout` scrolls into view.
+        """
+        self.pending_items = list(items)
+        self._add_item = add_item
+        if self.pending_items:
+            self._set_placeholder("", self.content_layout.indexOf(item_layout) + 1)
+            self.populate_next()
+
+    def populate_next(self):
+        """Builds the deferred inputs, or the next batch of deferred entries."""
+        if self._populate is not None:
+            populate, self._populate = self._populate, None
+            self._clear_placeholder()
+            populate()
+            return
+        if not self.pending_items:
+            return
+        batch = self.pending_items[:LAZY_ITEMS_PER_BATCH]
+        self.pending_items = self.pending_items[LAZY_ITEMS_PER_BATCH:]
+        for entry in batch:
+            self._add_item(entry)
+        if self.pending_items:
+            self._placeholder.setText(f"Show {len(self.pending_items)} more entries")
+        else:
+            self._clear_placeholder()
+            self._add_item = None
+
+    def ensure_populated(self):
+        """Builds everything still deferred, e.g. before code that walks all entries."""
+        while self._placeholder is not None:
+            self.populate_next()
+
+    def _set_placeholder(self, label, index):
+        self._placeholder = QPushButton(label)
+        self._placeholder.setFlat(True)
+        self._placeholder.clicked.connect(lambda *args: self.populate_next())
+        self.content_layout.insertWidget(index, self._placeholder)
+
+    def _clear_placeholder(self):
+        self.content_layout.removeWidget(self._placeholder)
+        self._placeholder.deleteLater()
+        self._placeholder = None
+
+    def watch(self, widget, item_group=None):
+        widget.textChanged.connect(lambda *args: self.mark_dirty(item_group))
+
+    def mark_dirty(self, item_group=None):
+        self.dirty = True
+        self.cached_model = None
+        if item_group is not None:
+            self.item_cache.pop(item_group, None)
+
 class AddCustomSectionDialog(QDialog):
     """A dialog to create a custom section with a title and user-defined fields."""
     def __init__(self, parent=None):
@@ -89,37 +182,96 @@ class AddCustomSectionDialog(QDialog):
         return {"title": title, "fields": fields}
 
 class ATSResultsDialog(QDialog):
-    """A custom dialog to display ATS check results beautifully."""
-    def __init__(self, data, parent=None):
+    """
+    Shows the local ATS score and keyword coverage. The AI's narrative feedback is
+    optional: `request_feedback` (if given) is called when the user asks for it,
+    and the result is passed back through show_ai_feedback / show_ai_error.
+    """
+    def __init__(self, result, parent=None, request_feedback=None):
         super().__init__(parent)
         self.setWindowTitle("ATS Check Results")
         self.setMinimumSize(500, 600)
+        self._request_feedback = request_feedback
         layout = QVBoxLayout(self)
 
-        score_label = QLabel(f"<h2>ATS Score: {data.get('score', 'N/A')}/100</h2>")
+        score_label = QLabel(f"<h2>ATS Score: {result.get('score', 'N/A')}/100</h2>")
         score_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(score_label)
+        timing_label = QLabel(f"Keyword match computed locally in {result.get('elapsed_ms', 0):.0f} ms.")
+        timing_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(timing_label)
+
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        content = QWidget()
+        self.content_layout = QVBoxLayout(content)
+        scroll.setWidget(content)
+        layout.addWidget(scroll)
+
+        coverage = [f"{s['title']}: {s['coverage']}% of keyword weight" for s in result.get('section_coverage', [])]
+        self.content_layout.addWidget(self._feedback_group("Keyword Coverage by Section", coverage, "📊"))
+        self.content_layout.addWidget(self._keyword_group("Matched Keywords", result.get('matched_keywords', [])))
+        self.content_layout.addWidget(self._keyword_group("Missing Keywords", result.get('missing_keywords', [])))
+
+        self.ai_group = QGroupBox("AI Feedback")
+        self.ai_layout = QVBoxLayout(self.ai_group)
+        self.ai_button = QPushButton("Get AI Feedback")
+        if request_feedback:
+            self.ai_button.setToolTip("Asks the AI for strengths, weaknesses and keyword suggestions. "
+                                      "Shift+click to re-run instead of using a cached result.")
+            self.ai_button.clicked.connect(self._on_ai_button_clicked)
+        else:
+            self.ai_button.setEnabled(False)
+            self.ai_button.setToolTip("Set your OpenRouter API key to get narrative feedback.")
+        self.ai_layout.addWidget(self.ai_button)
+        self.content_layout.addWidget(self.ai_group)
+        self.content_layout.addStretch()
 
-        summary_label = QLabel(f"<b>Summary:</b> {data.get('match_summary', 'No summary provided.')}")
-        summary_label.setWordWrap(True)
-        layout.addWidget(summary_label)
-
-        def create_feedback_group(title, items, icon):
-            group = QGroupBox(title)
-            group_layout = QVBoxLayout(group)
-            if not items:
-                group_layout.addWidget(QLabel("None provided."))
-            else:
-                for item in items:
-                    label = QLabel(f"{icon} {item}")
-                    label.setWordWrap(True)
-                    group_layout.addWidget(label)
-            return group
-
-        layout.addWidget(create_feedback_group("Strengths", data.get('strengths', []), "✅"))
-        layout.addWidget(create_feedback_group("Areas for Improvement", data.get('weaknesses', []), "🔧"))
-        layout.addWidget(create_feedback_group("Missing Keyword Suggestions", data.get('keyword_suggestions', []), "🔑"))
-        
         ok_button = QPushButton("OK")
         ok_button.clicked.connect(self.accept)
-        layout.addWidget(ok_button, alignment=Qt.AlignmentFlag.AlignRight)
\ No newline at end of file
+        layout.addWidget(ok_button, alignment=Qt.AlignmentFlag.AlignRight)
+
+    @staticmethod
+    def _feedback_group(title, items, icon):
+        group = QGroupBox(title)
+        group_layout = QVBoxLayout(group)
+        if not items:
+            group_layout.addWidget(QLabel("None provided."))
+        else:
+            for item in items:
+                label = QLabel(f"{icon} {item}")
+                label.setWordWrap(True)
+                group_layout.addWidget(label)
+        return group
+
+    @staticmethod
+    def _keyword_group(title, keywords):
+        group = QGroupBox(title)
+        group_layout = QVBoxLayout(group)
+        label = QLabel(", ".join(keywords) if keywords else "None.")
+        label.setWordWrap(True)
+        group_layout.addWidget(label)
+        return group
+
+    def _on_ai_button_clicked(self):
+        self.ai_button.setEnabled(False)
+        self.ai_button.setText("Waiting for AI feedback...")
+        self._request_feedback()
+
+    def show_ai_feedback(self, data):
+        """Replaces the AI button with the narrative feedback parsed from the AI's JSON answer."""
+        self.ai_button.hide()
+        summary_label = QLabel(f"<b>AI Score: {data.get('score', 'N/A')}/100.</b> "
+                               f"{data.get('match_summary', 'No summary provided.')}")
+        summary_label.setWordWrap(True)
+        self.ai_layout.addWidget(summary_label)
+        self.ai_layout.addWidget(self._feedback_group("Strengths", data.get('strengths', []), "✅"))
+        self.ai_layout.addWidget(self._feedback_group("Areas for Improvement", data.get('weaknesses', []), "🔧"))
+        self.ai_layout.addWidget(self._feedback_group("Missing Keyword Suggestions", data.get('keyword_suggestions', []), "🔑"))
+
+    def show_ai_error(self, message):
+        self.ai_button.setEnabled(True)
+        self.ai_button.setText("Get AI Feedback")
+        error_label = QLabel(f"🔧 {message}")
+        error_label.setWordWrap(True)
+        self.ai_layout.addWidget(error_label)
\ No newline at end of file
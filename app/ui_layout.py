@@ -3,8 +3,8 @@ from PyQt6.QtWidgets import (
     QTextEdit, QPushButton, QComboBox, QScrollArea, QGroupBox, QLabel, QCheckBox,
     QInputDialog, QToolButton, QStyle, QMainWindow
 )
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QIcon, QAction
+from PyQt6.QtCore import Qt, QPoint, QTimer
+from PyQt6.QtGui import QIcon, QAction, QKeySequence
 from .ui_components import SectionWidget
 
 
@@ -99,6 +99,16 @@ class UILayout:
         toolbar = self.win.addToolBar("Main")
         toolbar.setMovable(False)
 
+        open_project_action = QAction(QIcon.fromTheme("document-open"), "Open Project", self.win)
+        open_project_action.setShortcut(QKeySequence.StandardKey.Open)
+        open_project_action.triggered.connect(lambda: self.eh.open_project_file())
+        toolbar.addAction(open_project_action)
+
+        save_project_action = QAction(QIcon.fromTheme("document-save-as"), "Save Project", self.win)
+        save_project_action.setShortcut(QKeySequence.StandardKey.Save)
+        save_project_action.triggered.connect(self.eh.save_project_file)
+        toolbar.addAction(save_project_action)
+
         save_action = QAction(QIcon.fromTheme("document-save"), "Save PDF", self.win)
         save_action.triggered.connect(self.eh.save_final_pdf)
         toolbar.addAction(save_action)
@@ -140,6 +150,10 @@ class UILayout:
         self.win.sections_layout = QVBoxLayout(self.win.sections_container)
         self.win.sections_layout.setSpacing(15)
         scroll_area.setWidget(self.win.sections_container)
+        # Sections loaded from a project are built as they scroll into view.
+        self.win.sections_scroll = scroll_area
+        scroll_area.verticalScrollBar().valueChanged.connect(self.populate_visible_sections)
+        scroll_area.verticalScrollBar().rangeChanged.connect(self.populate_visible_sections)
         
         controls_box = CollapsibleBox("Controls & Actions")
         v2 = QVBoxLayout(controls_box.content_area)
@@ -190,11 +204,20 @@ class UILayout:
 
         ats_button = QPushButton("Check ATS Score")
         ats_button.setIcon(self.win.style().standardIcon(QStyle.StandardPixmap.SP_DialogApplyButton))
+        ats_button.setToolTip("Scores keyword coverage locally; narrative AI feedback is available from the results.")
         ats_button.clicked.connect(self.eh.handle_ats_check)
         ats_layout.addWidget(ats_button)
 
+        self.win.live_ats_label = QLabel("Live ATS score: paste a job description.")
+        self.win.live_ats_label.setWordWrap(True)
+        self.win.live_ats_label.setToolTip("Updated locally as you edit; click 'Check ATS Score' for details.")
+        ats_layout.addWidget(self.win.live_ats_label)
+        self.win.job_description_input.textChanged.connect(self.eh.schedule_ats_update)
+
         ats_group.setVisible(False)
         ats_checkbox.toggled.connect(ats_group.setVisible)
+        ats_checkbox.toggled.connect(self.eh.schedule_ats_update)
+        self.win.ats_group = ats_group
         layout.addWidget(ats_group)
 
         # --- Other Controls ---
@@ -225,42 +248,90 @@ class UILayout:
         layout.addStretch(1)
         return group
 
-    def add_section(self, section_type, title=None):
+    def add_section(self, section_type, title=None, content=None, lazy=False):
+        """
+        Appends a section. `content` (gather_data section content) pre-fills it;
+        with `lazy`, its inputs are only built once it scrolls into view.
+        """
         if not title:
             title = section_type.replace('_', ' ').title()
         section = SectionWidget(title, section_type)
+        if lazy and content is not None:
+            section.defer({'type': section_type, 'title': title, 'content': content},
+                          lambda: self.populate_section(section, content, lazy=True))
+        else:
+            self.populate_section(section, content)
 
-        if section_type in ['summary', 'skills', 'custom']:
+        section.up_button.clicked.connect(lambda: self.eh.move_section(section, -1))
+        section.down_button.clicked.connect(lambda: self.eh.move_section(section, 1))
+        section.delete_button.clicked.connect(lambda: self.eh.delete_section(section))
+        self.win.sections_layout.addWidget(section)
+        return section
+
+    def populate_section(self, section, content=None, lazy=False):
+        """
+        Builds the inputs of `section`; a fresh list section gets one empty entry.
+        With `lazy`, list entries are built in batches as they scroll into view.
+        """
+        section_type = section.section_type
+        if section_type in ['summary', 'skills', 'custom', 'custom_textarea']:
             content_widget = QTextEdit()
+            if content:
+                content_widget.setPlainText(content)
             content_widget.textChanged.connect(self.eh.schedule_preview_update)
+            section.watch(content_widget)
             section.content_layout.addWidget(content_widget)
             if section_type == 'summary':
                 ai_button = QPushButton("Get AI Suggestion")
                 ai_button.setIcon(self.win.style().standardIcon(QStyle.StandardPixmap.SP_ComputerIcon))
-                ai_button.clicked.connect(lambda: self.eh.handle_targeted_ai_suggestion("summary", content_widget))
+                ai_button.setToolTip("Shift+click to regenerate instead of using a cached suggestion.")
+                ai_button.clicked.connect(lambda ch, b=ai_button: self.eh.handle_targeted_ai_suggestion("summary", content_widget, trigger=b))
                 section.content_layout.addWidget(ai_button)
         elif section_type == 'experience':
             section.content = QVBoxLayout()
             add_job_button = QPushButton("Add Job")
-            add_job_button.clicked.connect(lambda: self.add_experience_item(section.content))
+            add_job_button.clicked.connect(lambda: self._append_item(section, self.add_experience_item))
+            rewrite_all_button = QPushButton("AI Rewrite All Job Descriptions")
+            rewrite_all_button.setIcon(self.win.style().standardIcon(QStyle.StandardPixmap.SP_ComputerIcon))
+            rewrite_all_button.setToolTip("Rewrites every job in this section with a single AI request. Shift+click to regenerate.")
+            rewrite_all_button.clicked.connect(lambda ch, b=rewrite_all_button: self.eh.handle_rewrite_all_jobs(section, trigger=b))
             section.content_layout.addLayout(section.content)
             section.content_layout.addWidget(add_job_button)
-            self.add_experience_item(section.content)
+            section.content_layout.addWidget(rewrite_all_button)
+            self._add_items(section, content, self.add_experience_item, lazy)
         elif section_type == 'education':
             section.content = QVBoxLayout()
             add_edu_button = QPushButton("Add Degree")
-            add_edu_button.clicked.connect(lambda: self.add_education_item(section.content))
+            add_edu_button.clicked.connect(lambda: self._append_item(section, self.add_education_item))
             section.content_layout.addLayout(section.content)
             section.content_layout.addWidget(add_edu_button)
-            self.add_education_item(section.content)
-
-        section.up_button.clicked.connect(lambda: self.eh.move_section(section, -1))
-        section.down_button.clicked.connect(lambda: self.eh.move_section(section, 1))
-        section.delete_button.clicked.connect(lambda: self.eh.delete_section(section))
-        self.win.sections_layout.addWidget(section)
-        return section
-
-    def add_experience_item(self, layout):
+            self._add_items(section, content, self.add_education_item, lazy)
+        elif section_type == 'custom_fields':
+            section.content = QVBoxLayout()
+            section.content_layout.addLayout(section.content)
+            self._add_items(section, content or [], self.add_custom_fields_item, lazy)
+
+    def _add_items(self, section, content, add_item, lazy):
+        entries = content if content is not None else [None]
+        if lazy:
+            section.defer_items(section.content, entries, lambda entry: add_item(section.content, section, entry))
+        else:
+            for entry in entries:
+                add_item(section.content, section, entry)
+
+    def _append_item(self, section, add_item):
+        # Deferred entries come first, so build them before appending a new one.
+        section.ensure_populated()
+        add_item(section.content, section)
+
+    @staticmethod
+    def _set_text(widget, value):
+        if isinstance(widget, QTextEdit):
+            widget.setPlainText(value or "")
+        else:
+            widget.setText(value or "")
+
+    def add_experience_item(self, layout, section=None, values=None):
         group = QGroupBox("Job")
         form = QFormLayout(group)
         widgets = {
@@ -272,24 +343,82 @@ class UILayout:
         }
         for key, widget in widgets.items():
             form.addRow(f"{key.title()}:", widget)
+            if values:
+                self._set_text(widget, values.get(key))
             widget.textChanged.connect(self.eh.schedule_preview_update)
+            if section is not None:
+                section.watch(widget, group)
         ai_button = QPushButton("AI Suggestion for this Description")
         ai_button.setIcon(self.win.style().standardIcon(QStyle.StandardPixmap.SP_ComputerIcon))
-        ai_button.clicked.connect(lambda ch, w=widgets, g=group: self.eh.handle_targeted_ai_suggestion("experience_description", w['description'], g))
+        ai_button.setToolTip("Shift+click to regenerate instead of using a cached suggestion.")
+        ai_button.clicked.connect(lambda ch, w=widgets, g=group, b=ai_button: self.eh.handle_targeted_ai_suggestion("experience_description", w['description'], g, trigger=b))
         form.addRow(ai_button)
         group.setProperty("widgets", widgets)
         layout.addWidget(group)
+        if section is not None:
+            section.mark_dirty()
 
-    def add_education_item(self, layout):
+    def add_education_item(self, layout, section=None, values=None):
         group = QGroupBox("Degree")
         form = QFormLayout(group)
         widgets = {'degree': QLineEdit(), 'university': QLineEdit(), 'years': QLineEdit()}
         for key, widget in widgets.items():
             form.addRow(f"{key.title()}:", widget)
+            if values:
+                self._set_text(widget, values.get(key))
             widget.textChanged.connect(self.eh.schedule_preview_update)
+            if section is not None:
+                section.watch(widget, group)
         group.setProperty("widgets", widgets)
         layout.addWidget(group)
-        
+        if section is not None:
+            section.mark_dirty()
+
+    def add_custom_fields_item(self, layout, section, values):
+        group = QGroupBox("Entry")
+        form = QFormLayout(group)
+        widgets = {key: QLineEdit() for key in values}
+        for key, widget in widgets.items():
+            form.addRow(f"{key}:", widget)
+            self._set_text(widget, values[key])
+            widget.textChanged.connect(self.eh.schedule_preview_update)
+            section.watch(widget, group)
+        group.setProperty("widgets", widgets)
+        layout.addWidget(group)
+        section.mark_dirty()
+
+    def populate_visible_sections(self, *args):
+        """Builds deferred sections that are in view, or within half a screen of it."""
+        viewport = self.win.sections_scroll.viewport()
+        margin = viewport.height() // 2
+        layout = self.win.sections_layout
+        for i in range(layout.count()):
+            section = layout.itemAt(i).widget()
+            anchor = section.lazy_anchor if isinstance(section, SectionWidget) else None
+            if anchor is None:
+                continue
+            top = anchor.mapTo(viewport, QPoint(0, 0)).y()
+            if top < viewport.height() + margin and top + anchor.height() > -margin:
+                section.populate_next()
+
+    def load_resume_data(self, data, lazy=True):
+        """Replaces the personal details and all sections with `data` (a gather_data dict)."""
+        self.win.name_input.setText(data.get('name', ""))
+        self.win.email_input.setText(data.get('email', ""))
+        self.win.phone_input.setText(data.get('phone', ""))
+        self.win.linkedin_input.setText(data.get('linkedin', ""))
+
+        layout = self.win.sections_layout
+        while layout.count():
+            old = layout.takeAt(0).widget()
+            if old:
+                old.deleteLater()
+        for section in data.get('sections', []):
+            self.add_section(section.get('type'), section.get('title'), section.get('content'), lazy=lazy)
+        if lazy:
+            # Positions are only known once the new sections have been laid out.
+            QTimer.singleShot(0, self.populate_visible_sections)
+
     def add_custom_section_dialog(self):
         text, ok = QInputDialog.getText(self.win, "Add Custom Section", "Enter the title for the new section:")
         if ok and text:
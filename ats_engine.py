@@ -0,0 +1,238 @@
+import re
+import time
+import hashlib
+import logging
+import threading
+from collections import Counter, OrderedDict
+import numpy as np
+
+from resume_model import Resume
+
+logger = logging.getLogger()
+
+# BM25 term-frequency saturation and section-length normalisation.
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Bigrams such as "machine learning" count as keywords alongside single words. A
+# job-description bigram only becomes a keyword if it is repeated or the resume has it.
+USE_BIGRAMS = True
+MAX_REPORTED_KEYWORDS = 25
+
+# Keeps tokens like "c++", "c#", "node.js" and "ci/cd" intact.
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+# Bigrams never span punctuation or line breaks.
+_PHRASE_BREAK = re.compile(r"[,;:!?()\[\]\n]|\.(?:\s|$)")
+_STOPWORDS = frozenset("""
+a about above across after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each either etc few for from further
+had has have having he her here hers him his how i if in into is it its itself just least less like
+may me might more most must my no nor not of off on once only or other our ours out over own per
+please plus same shall she should so some such than that the their them then there these they this
+those through to too under until up upon us very via was we well were what when where which while who
+whom why will with within without would you your yours
+ability able across candidate candidates company experience including join looking role strong team
+work working year years etc e.g i.e need needs required requirements responsibilities preferred ideal
+nice seeking skills knowledge understanding
+""".split())
+
+
+def tokenize(text):
+    """
+    Lowercased word tokens without stopwords, plus (with USE_BIGRAMS) bigrams of
+    directly adjacent words within the same phrase.
+    """
+    words, bigrams = [], []
+    for phrase in _PHRASE_BREAK.split((text or "").lower()):
+        previous = None
+        for raw in _TOKEN_PATTERN.findall(phrase):
+            word = raw.strip('./-')
+            if not word or word in _STOPWORDS or word.isdigit():
+                previous = None
+                continue
+            words.append(word)
+            if previous:
+                bigrams.append(f"{previous} {word}")
+            previous = word
+    return words + bigrams if USE_BIGRAMS else words
+
+
+def section_text(section):
+    """Flattens the content of one gather_data section into plain text."""
+    content = section.get('content')
+    if isinstance(content, str):
+        return content
+    parts = []
+    for item in content or []:
+        if isinstance(item, dict):
+            for value in item.values():
+                parts.extend(value if isinstance(value, list) else [value])
+        else:
+            parts.append(item)
+    return "\n".join(str(p) for p in parts if p)
+
+
+def _has_content(section):
+    content = section.content
+    if isinstance(content, tuple):
+        return any(v.strip() for item in content for v in item.to_dict().values())
+    return bool(content and content.strip())
+
+
+class _JobProfile:
+    """A tokenized, vectorized job description: every term it uses, in column order."""
+    __slots__ = ('vocab', 'index', 'tf', 'line_presence', 'line_count', 'is_bigram', 'repeated')
+
+    def __init__(self, job_description):
+        counts = Counter(tokenize(job_description))
+        self.vocab = list(counts)
+        self.index = {term: i for i, term in enumerate(self.vocab)}
+        self.tf = np.fromiter((counts[t] for t in self.vocab), dtype=np.float64, count=len(self.vocab))
+        self.is_bigram = np.array([' ' in t for t in self.vocab], dtype=bool)
+        self.repeated = self.tf > 1
+        # Number of description lines containing each term, for IDF.
+        self.line_presence = np.zeros(len(self.vocab), dtype=np.float64)
+        self.line_count = 0
+        for line in (job_description or "").splitlines():
+            if not line.strip():
+                continue
+            self.line_count += 1
+            cols = [self.index[t] for t in set(tokenize(line)) if t in self.index]
+            self.line_presence[cols] += 1
+
+    def vectorize(self, tokens):
+        """Returns the term-count row of `tokens` over this profile's vocabulary."""
+        row = np.zeros(len(self.vocab), dtype=np.float64)
+        for term, count in Counter(tokens).items():
+            col = self.index.get(term)
+            if col is not None:
+                row[col] = count
+        return row
+
+
+class AtsScorer:
+    """
+    Incremental local ATS scorer. The vectorized job description and each
+    section's term vector are cached by content hash, so re-scoring after an
+    edit only tokenizes the sections that changed before re-aggregating.
+    """
+    def __init__(self, max_profiles=4, max_sections=1024):
+        self.max_profiles = max_profiles
+        self.max_sections = max_sections
+        self._profiles = OrderedDict()  # description hash -> _JobProfile
+        self._sections = OrderedDict()  # (description hash, section digest) -> (term row, token count)
+        self._lock = threading.Lock()
+        self.stats = {'profile_hits': 0, 'profile_misses': 0, 'section_hits': 0, 'section_misses': 0}
+
+    def _profile(self, job_description):
+        key = hashlib.sha1((job_description or "").encode('utf-8')).hexdigest()
+        profile = self._profiles.get(key)
+        if profile is not None:
+            self._profiles.move_to_end(key)
+            self.stats['profile_hits'] += 1
+            return key, profile
+        self.stats['profile_misses'] += 1
+        profile = self._profiles[key] = _JobProfile(job_description)
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+        return key, profile
+
+    def _section_vector(self, profile_key, profile, section):
+        key = (profile_key, section.digest)
+        cached = self._sections.get(key)
+        if cached is not None:
+            self._sections.move_to_end(key)
+            self.stats['section_hits'] += 1
+            return cached
+        self.stats['section_misses'] += 1
+        tokens = tokenize(section_text(section.to_dict()))
+        cached = self._sections[key] = (profile.vectorize(tokens), max(1, len(tokens)))
+        while len(self._sections) > self.max_sections:
+            self._sections.popitem(last=False)
+        return cached
+
+    def score(self, job_description, resume_data):
+        """
+        Scores `resume_data` (the gather_data dict or a resume_model.Resume) against
+        `job_description` locally.
+
+        Every job-description term is a keyword, weighted by its frequency in the
+        description and its IDF across the description's lines and the resume
+        sections (terms found everywhere weigh little). A bigram only counts if it
+        is repeated in the description or the resume uses it. Each resume section's
+        match on a term is BM25-saturated, scaled so that one mention in a section
+        of average length counts fully, and the resume covers a term as well as
+        its best section does. The score is the weighted share of keywords covered, 0-100.
+
+        Returns a dict with score, matched_keywords, missing_keywords (most important
+        first), section_coverage (list of {'title', 'type', 'coverage'} in percent),
+        elapsed_ms and reused_sections (sections served from the cache).
+        """
+        start = time.perf_counter()
+        resume = resume_data if isinstance(resume_data, Resume) else Resume.from_dict(resume_data)
+        sections = [s for s in resume.sections if _has_content(s)]
+        with self._lock:
+            hits_before = self.stats['section_hits']
+            profile_key, profile = self._profile(job_description)
+            vectors = [self._section_vector(profile_key, profile, s) for s in sections]
+            reused = self.stats['section_hits'] - hits_before
+
+        result = {'score': 0, 'matched_keywords': [], 'missing_keywords': [], 'section_coverage': [],
+                  'elapsed_ms': 0.0, 'reused_sections': reused}
+        vocab_size = len(profile.vocab)
+        tf = np.vstack([row for row, _ in vectors]) if vectors else np.zeros((0, vocab_size))
+        lengths = np.array([length for _, length in vectors], dtype=np.float64)
+
+        active = ~profile.is_bigram | profile.repeated | (tf > 0).any(axis=0)
+        if not active.any():
+            result['elapsed_ms'] = (time.perf_counter() - start) * 1000
+            return result
+
+        doc_count = profile.line_count + len(sections)
+        df = profile.line_presence + (tf > 0).sum(axis=0)
+        idf = np.log((doc_count + 1) / (df + 1)) + 1
+        weights = np.where(active, (1 + np.log(profile.tf)) * idf, 0.0)
+        total_weight = weights.sum()
+
+        if len(sections):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / lengths.mean())
+            saturation = np.minimum(1.0, tf * (BM25_K1 + 1) / (tf + norm[:, None]))
+            coverage = saturation.max(axis=0)
+            section_share = (tf > 0) @ weights / total_weight
+        else:
+            coverage = np.zeros(vocab_size)
+            section_share = np.zeros(0)
+
+        order = [i for i in np.argsort(-weights, kind='stable') if active[i]]
+        result['score'] = int(round(100 * float(coverage @ weights) / total_weight))
+        result['matched_keywords'] = [profile.vocab[i] for i in order if coverage[i] > 0][:MAX_REPORTED_KEYWORDS]
+        result['missing_keywords'] = [profile.vocab[i] for i in order if coverage[i] == 0][:MAX_REPORTED_KEYWORDS]
+        result['section_coverage'] = [
+            {'title': (s.title or s.type or "Section").strip(), 'type': s.type, 'coverage': int(round(100 * float(share)))}
+            for s, share in zip(sections, section_share)
+        ]
+        result['elapsed_ms'] = (time.perf_counter() - start) * 1000
+        logger.info(f"Local ATS score {result['score']}/100 over {int(active.sum())} keyword(s) in "
+                    f"{result['elapsed_ms']:.1f} ms ({reused}/{len(sections)} section(s) unchanged).")
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+            self._sections.clear()
+
+
+_scorer = None
+_scorer_lock = threading.Lock()
+
+def get_ats_scorer():
+    """Returns the process-wide AtsScorer."""
+    global _scorer
+    with _scorer_lock:
+        if _scorer is None:
+            _scorer = AtsScorer()
+        return _scorer
+
+
+def score_resume(job_description, resume_data):
+    """Scores `resume_data` against `job_description` with the shared AtsScorer; see AtsScorer.score."""
+    return get_ats_scorer().score(job_description, resume_data)
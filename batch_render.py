@@ -0,0 +1,114 @@
+"""
+Headless batch renderer: compiles every resume JSON file in a directory with
+every requested template, without importing PyQt6.
+
+Usage:
+    python batch_render.py resumes/ --templates moderncv classiccv [--workers 4]
+
+Each JSON file must have the shape produced by app.data_handler.gather_data.
+Like the GUI, it resolves templates/ and output/ against the working directory,
+so run it from the project root. PDFs are written to output/<file stem>_<template>.pdf.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+
+import latex_service
+
+logger = logging.getLogger()
+
+def load_resumes(input_dir):
+    """Returns a list of (stem, data) for every *.json file in input_dir, sorted by name."""
+    resumes = []
+    for filename in sorted(os.listdir(input_dir)):
+        if not filename.endswith('.json'):
+            continue
+        path = os.path.join(input_dir, filename)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                resumes.append((os.path.splitext(filename)[0], json.load(f)))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Skipping unreadable resume file '{path}': {e}")
+    return resumes
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def _timed_render(data, template_name, output_name):
+    start = time.perf_counter()
+    pdf_path = latex_service.generate_latex_resume(data, template_name, output_name=output_name)
+    return pdf_path, time.perf_counter() - start
+
+def render_batch(resumes, templates, workers=None):
+    """
+    Renders every resume x template combination on the compile pool, running at
+    most `workers` (default: COMPILE_POOL_SIZE) at once. Returns a summary dict.
+    """
+    pool = latex_service.get_compile_pool(workers)
+    start = time.perf_counter()
+    futures = []
+    for stem, data in resumes:
+        for template_name in templates:
+            output_name = f"{stem}_{template_name}"
+            futures.append((output_name, pool.submit(_timed_render, data, template_name, output_name)))
+
+    latencies, failures = [], []
+    for output_name, future in futures:
+        pdf_path, elapsed = future.result()
+        latencies.append(elapsed)
+        if not pdf_path:
+            failures.append(output_name)
+    wall_seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'jobs': len(futures),
+        'failures': failures,
+        'wall_seconds': wall_seconds,
+        'jobs_per_second': len(futures) / wall_seconds if wall_seconds > 0 else 0.0,
+        'p50_seconds': percentile(latencies, 50),
+        'p95_seconds': percentile(latencies, 95),
+    }
+
+def print_summary(summary):
+    print(f"Jobs:        {summary['jobs']} ({len(summary['failures'])} failed)")
+    print(f"Wall time:   {summary['wall_seconds']:.2f} s")
+    print(f"Throughput:  {summary['jobs_per_second']:.2f} jobs/s")
+    print(f"Latency p50: {summary['p50_seconds'] * 1000:.0f} ms")
+    print(f"Latency p95: {summary['p95_seconds'] * 1000:.0f} ms")
+    for output_name in summary['failures']:
+        print(f"  FAILED: {output_name}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render many resume JSON files across templates without the GUI.")
+    parser.add_argument('input_dir', help="Directory containing resume *.json files.")
+    parser.add_argument('--templates', nargs='+', default=['moderncv'], help="Template names under templates/.")
+    parser.add_argument('--workers', type=int, default=latex_service.COMPILE_POOL_SIZE,
+                        help="Maximum number of concurrent pdflatex jobs (default: CPU count).")
+    parser.add_argument('--verbose', action='store_true', help="Log every compile step.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    resumes = load_resumes(args.input_dir)
+    if not resumes:
+        print(f"No resume JSON files found in '{args.input_dir}'.", file=sys.stderr)
+        return 1
+
+    summary = render_batch(resumes, args.templates, workers=max(1, args.workers))
+    print_summary(summary)
+    return 1 if summary['failures'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Measures the AI request paths against the bundled mock OpenRouter server, so
+no account or network is needed:
+
+  * prompt building: resume context + prompt construction, no I/O
+  * end-to-end latency of get_targeted_ai_suggestion, its streamed variant
+    (time to first token and total) and get_ats_score_and_feedback
+  * throughput of distinct suggestion requests at several concurrency levels
+
+The response cache is bypassed (use_cache=False) and written to a temporary
+directory. Prompts differ per request so in-flight coalescing does not hide work.
+
+Usage (from the repository root):
+    python benchmarks/bench_ai_paths.py [--runs 20] [--latency 0.05] [--concurrency 1 4 8] [--requests 32]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import openrouter_service
+from batch_render import percentile
+from prompt_context import build_resume_context
+from mock_openrouter import MockConfig, start_mock_server
+from sample_data import SAMPLE_RESUME
+
+JOB_DESCRIPTION = ("Senior Backend Engineer. Python, PostgreSQL, Kafka and Kubernetes. "
+                   "Own event-driven services on AWS and mentor engineers.")
+
+def summarize(timings):
+    timings = sorted(timings)
+    return f"p50 {percentile(timings, 50) * 1000:8.2f} ms   p95 {percentile(timings, 95) * 1000:8.2f} ms"
+
+def time_calls(fn, runs):
+    timings = []
+    for i in range(runs):
+        start = time.perf_counter()
+        fn(i)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def bench_prompt_building(runs):
+    def suggestion(i):
+        context = openrouter_service._suggestion_context(f"Engineer {i}", SAMPLE_RESUME, 'summary', None)
+        openrouter_service._build_suggestion_prompt(f"Engineer {i}", context, "Write a summary.")
+
+    def ats(i):
+        build_resume_context(SAMPLE_RESUME, 'ats', focus_text=JOB_DESCRIPTION,
+                             token_budget=openrouter_service.ATS_CONTEXT_TOKEN_BUDGET)
+
+    print(f"{'suggestion prompt':<28} {summarize(time_calls(suggestion, runs))}")
+    print(f"{'ATS prompt context':<28} {summarize(time_calls(ats, runs))}")
+
+def bench_latency(runs):
+    def suggestion(i):
+        result = openrouter_service.get_targeted_ai_suggestion(
+            'mock-key', f"Engineer {i}", SAMPLE_RESUME, 'summary', use_cache=False)
+        if result.startswith("Error"):
+            raise RuntimeError(result)
+
+    first_token = []
+
+    def streamed(i):
+        start = time.perf_counter()
+        for n, _ in enumerate(openrouter_service.stream_targeted_ai_suggestion(
+                'mock-key', f"Streamer {i}", SAMPLE_RESUME, 'summary', use_cache=False)):
+            if n == 0:
+                first_token.append(time.perf_counter() - start)
+
+    def ats(i):
+        result = openrouter_service.get_ats_score_and_feedback(
+            'mock-key', f"{JOB_DESCRIPTION} Req {i}.", SAMPLE_RESUME, use_cache=False)
+        if '"error"' in result[:20]:
+            raise RuntimeError(result)
+
+    print(f"{'suggestion':<28} {summarize(time_calls(suggestion, runs))}")
+    streamed_total = time_calls(streamed, runs)
+    print(f"{'streamed: first token':<28} {summarize(first_token)}")
+    print(f"{'streamed: complete':<28} {summarize(streamed_total)}")
+    print(f"{'ATS feedback':<28} {summarize(time_calls(ats, runs))}")
+
+def bench_throughput(levels, requests_per_level):
+    for workers in levels:
+        def one(i, workers=workers):
+            return openrouter_service.get_targeted_ai_suggestion(
+                'mock-key', f"Role {workers}-{i}", SAMPLE_RESUME, 'skills', use_cache=False)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(one, range(requests_per_level)))
+        elapsed = time.perf_counter() - start
+        failures = sum(1 for r in results if r.startswith("Error"))
+        print(f"{f'concurrency {workers}':<28} {requests_per_level / elapsed:8.1f} req/s   "
+              f"({requests_per_level} requests, {failures} failed)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.05, help="Mock server latency per request, seconds.")
+    parser.add_argument('--chunk-delay', type=float, default=0.002, help="Mock delay between streamed words, seconds.")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--requests', type=int, default=32, help="Requests per concurrency level.")
+    args = parser.parse_args()
+
+    server = start_mock_server(MockConfig(latency=args.latency, stream_chunk_delay=args.chunk_delay))
+    openrouter_service.OPENROUTER_BASE_URL = server.base_url
+    # Measure the client, not the client-side rate limiter.
+    openrouter_service.RATE_LIMIT_PER_SECOND = 1e9
+    openrouter_service.RATE_LIMIT_BURST = 1e9
+    os.chdir(tempfile.mkdtemp(prefix='bench_ai_'))
+
+    print(f"Mock server at {server.base_url}, {args.latency * 1000:.0f} ms latency per request.\n")
+    bench_prompt_building(args.runs)
+    bench_latency(args.runs)
+    bench_throughput(args.concurrency, args.requests)
+
+    stats = openrouter_service.get_client().get_metrics()['stats']
+    print(f"\nClient: {stats['requests']} requests, {stats['reused_connections']} on reused connections, "
+          f"{stats['retries']} retries.")
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Compares a full walk of the section widgets (gather_data(..., incremental=False))
+with incremental gathering, where only sections and item groups whose inputs
+changed are read again, on a form with hundreds of job entries.
+
+Runs headless (QT_QPA_PLATFORM=offscreen); only the sections part of the main
+window is built.
+
+Usage (from the repository root):
+    python benchmarks/bench_gather_data.py [--jobs 300] [--runs 20]
+"""
+import os
+import sys
+import time
+import argparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout, QLineEdit, QTextEdit, QGroupBox, QScrollArea
+
+from app.ui_layout import UILayout
+from app.data_handler import gather_data, gather_resume
+from batch_render import percentile
+from sample_data import SAMPLE_RESUME
+
+class NoOpHandlers:
+    """Stands in for EventHandlers; every handler does nothing."""
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+class SectionsOnlyLayout(UILayout):
+    """UILayout without setup_ui(): just the personal inputs and the scrollable sections list."""
+    def __init__(self, win, eh):
+        self.win = win
+        self.eh = eh
+        outer = QVBoxLayout(win)
+        for name in ('name_input', 'email_input', 'phone_input', 'linkedin_input'):
+            setattr(win, name, QLineEdit())
+            outer.addWidget(getattr(win, name))
+        scroll_area = QScrollArea()
+        scroll_area.setWidgetResizable(True)
+        win.sections_container = QWidget()
+        win.sections_layout = QVBoxLayout(win.sections_container)
+        scroll_area.setWidget(win.sections_container)
+        win.sections_scroll = scroll_area
+        scroll_area.verticalScrollBar().valueChanged.connect(self.populate_visible_sections)
+        scroll_area.verticalScrollBar().rangeChanged.connect(self.populate_visible_sections)
+        outer.addWidget(scroll_area, stretch=1)
+
+def build_window(job_count):
+    win = QWidget()
+    layout = SectionsOnlyLayout(win, NoOpHandlers())
+    win.name_input.setText(SAMPLE_RESUME['name'])
+
+    by_type = {s['type']: s for s in SAMPLE_RESUME['sections']}
+    summary = layout.add_section('summary')
+    experience = layout.add_section('experience')
+    for _ in range(job_count - 1):
+        layout.add_experience_item(experience.content, experience)
+    sample_jobs = by_type['experience']['content']
+    for i, group in enumerate(experience.findChildren(QGroupBox)):
+        job = sample_jobs[i % len(sample_jobs)]
+        widgets = group.property("widgets")
+        for key, widget in widgets.items():
+            value = f"{job[key]} ({i})" if key == 'title' else job[key]
+            if isinstance(widget, QTextEdit):
+                widget.setPlainText(value)
+            else:
+                widget.setText(value)
+    layout.add_section('education')
+    layout.add_section('skills')
+    return win, summary, experience
+
+def time_calls(fn, runs):
+    timings = []
+    for i in range(runs):
+        start = time.perf_counter()
+        fn(i)
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)
+
+def report(label, timings, baseline=None):
+    p50 = percentile(timings, 50)
+    speedup = f"   {baseline / p50:6.1f}x" if baseline else ""
+    print(f"{label:<34} p50 {p50 * 1000:8.2f} ms   p95 {percentile(timings, 95) * 1000:8.2f} ms{speedup}")
+    return p50
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=300)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    win, summary, experience = build_window(args.jobs)
+    summary_edit = summary.findChild(QTextEdit)
+    groups = experience.findChildren(QGroupBox)
+    print(f"{args.jobs} job entries, {win.sections_layout.count()} sections.\n")
+
+    full = report("full walk", time_calls(lambda i: gather_data(win, incremental=False), args.runs))
+    gather_data(win)
+    report("incremental, nothing edited", time_calls(lambda i: gather_data(win), args.runs), full)
+
+    def edit_summary(i):
+        summary_edit.setPlainText(f"Backend engineer, revision {i}.")
+        gather_data(win)
+    report("incremental, summary edited", time_calls(edit_summary, args.runs), full)
+
+    def edit_job(i):
+        description = groups[i % len(groups)].property("widgets")['description']
+        description.setPlainText(f"Rewrote the billing pipeline, revision {i}.")
+        gather_data(win)
+    report("incremental, one job edited", time_calls(edit_job, args.runs), full)
+
+    def edit_job_resume(i):
+        description = groups[(i * 7) % len(groups)].property("widgets")['description']
+        description.setPlainText(f"Cut p95 latency by {i}%.")
+        gather_resume(win)
+    report("gather_resume, one job edited", time_calls(edit_job_resume, args.runs), full)
+
+    assert gather_data(win) == gather_data(win, incremental=False), "incremental result differs from a full walk"
+    app.quit()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Compares cold pdflatex compiles against compiles started from a precompiled
+per-template format (see latex_service.FormatCache).
+
+Usage (from the repository root):
+    python benchmarks/bench_latex_formats.py [--runs N] [--templates moderncv classiccv moderncv_1]
+"""
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import statistics
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import latex_service
+from sample_data import SAMPLE_RESUME
+
+def time_compiles(tex_source, runs, fmt_name=None):
+    timings = []
+    with tempfile.TemporaryDirectory() as build_dir:
+        tex_filepath = os.path.join(build_dir, 'bench.tex')
+        with open(tex_filepath, 'w', encoding='utf-8') as f:
+            f.write(tex_source)
+        for _ in range(runs):
+            start = time.perf_counter()
+            process = latex_service.run_pdflatex(tex_filepath, build_dir, fmt_name)
+            timings.append(time.perf_counter() - start)
+            if process.returncode != 0:
+                raise RuntimeError(f"pdflatex failed:\n{process.stdout[-2000:]}")
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--templates', nargs='+', default=['moderncv', 'classiccv', 'moderncv_1'])
+    args = parser.parse_args()
+
+    if not shutil.which('pdflatex'):
+        sys.exit("pdflatex not found on PATH; nothing to benchmark.")
+    os.chdir(REPO_ROOT)
+
+    print(f"{'template':<12} {'cold (ms)':>10} {'format (ms)':>12} {'speedup':>8} {'format build (s)':>17}")
+    for template_name in args.templates:
+        rendered = latex_service.get_template_engine().render(template_name, SAMPLE_RESUME)
+        cold = statistics.median(time_compiles(rendered, args.runs))
+
+        builds_before = latex_service.get_format_cache().stats['build_seconds']
+        fmt_name, fmt_source = latex_service.prepare_format_source(template_name, rendered)
+        build_seconds = latex_service.get_format_cache().stats['build_seconds'] - builds_before
+        if not fmt_name:
+            print(f"{template_name:<12} {cold * 1000:>10.0f} {'n/a':>12} {'-':>8} {'(format build failed)':>17}")
+            continue
+        warm = statistics.median(time_compiles(fmt_source, args.runs, fmt_name))
+        print(f"{template_name:<12} {cold * 1000:>10.0f} {warm * 1000:>12.0f} {cold / warm:>7.1f}x {build_seconds:>17.2f}")
+
+if __name__ == '__main__':
+    main()
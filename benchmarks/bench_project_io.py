@@ -0,0 +1,101 @@
+"""
+Measures resume project files (project_store) on a resume with hundreds of
+job entries:
+
+  * size and encode/decode time per codec, against indented JSON
+  * opening the project in the editor: building every section up front versus
+    lazy loading, where only what is scrolled into view gets its inputs
+
+Runs headless (QT_QPA_PLATFORM=offscreen).
+
+Usage (from the repository root):
+    python benchmarks/bench_project_io.py [--jobs 300] [--runs 10]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import project_store
+from batch_render import percentile
+from sample_data import SAMPLE_RESUME
+
+def build_resume(job_count):
+    data = json.loads(json.dumps(SAMPLE_RESUME))
+    experience = next(s for s in data['sections'] if s['type'] == 'experience')
+    jobs = experience['content']
+    experience['content'] = [dict(jobs[i % len(jobs)], title=f"{jobs[i % len(jobs)]['title']} ({i})")
+                             for i in range(job_count)]
+    return data
+
+def p50_ms(fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return percentile(sorted(timings), 50) * 1000
+
+def bench_codecs(data, runs):
+    pretty = json.dumps(data, indent=2).encode('utf-8')
+    print(f"{'indented JSON':<16} {len(pretty):>9,} bytes   "
+          f"dump {p50_ms(lambda: json.dumps(data, indent=2), runs):7.2f} ms   "
+          f"load {p50_ms(lambda: json.loads(pretty), runs):7.2f} ms")
+    codecs = ['none', 'zlib'] + (['zstd'] if project_store.zstandard is not None else [])
+    for codec in codecs:
+        blob = project_store.encode_project(data, codec)
+        assert project_store.decode_project(blob) == data
+        print(f"{'project/' + codec:<16} {len(blob):>9,} bytes   "
+              f"dump {p50_ms(lambda: project_store.encode_project(data, codec), runs):7.2f} ms   "
+              f"load {p50_ms(lambda: project_store.decode_project(blob), runs):7.2f} ms")
+    if project_store.zstandard is None:
+        print("(install 'zstandard' to include zstd)")
+
+def bench_open(data, runs):
+    from PyQt6.QtWidgets import QApplication, QWidget
+    from app.data_handler import gather_data
+    from bench_gather_data import SectionsOnlyLayout, NoOpHandlers
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    for lazy in (False, True):
+        returned, settled = [], []
+        for _ in range(runs):
+            win = QWidget()
+            win.resize(600, 900)
+            layout = SectionsOnlyLayout(win, NoOpHandlers())
+            win.show()
+            app.processEvents()
+            start = time.perf_counter()
+            layout.load_resume_data(data, lazy=lazy)
+            returned.append(time.perf_counter() - start)
+            # Let the first screen lay out and fill in.
+            for _ in range(5):
+                app.processEvents()
+            settled.append(time.perf_counter() - start)
+            assert gather_data(win) == data
+            win.close()
+            win.deleteLater()
+            app.processEvents()
+        label = "lazy open" if lazy else "full open"
+        print(f"{label:<16} load_resume_data {percentile(sorted(returned), 50) * 1000:7.1f} ms   "
+              f"first screen ready {percentile(sorted(settled), 50) * 1000:7.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=300)
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    data = build_resume(args.jobs)
+    print(f"{args.jobs} job entries.\n")
+    bench_codecs(data, args.runs)
+    print()
+    bench_open(data, max(1, args.runs // 2))
+
+if __name__ == '__main__':
+    main()
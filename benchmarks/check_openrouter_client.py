@@ -0,0 +1,183 @@
+"""
+Checks OpenRouterClient's failure handling against the bundled mock OpenRouter
+server: retries, Retry-After, the client-side token bucket and the per-model
+circuit breaker. Sleeps and the clock are injected, so nothing actually waits
+and every delay can be asserted exactly.
+
+Usage (from the repository root):
+    python benchmarks/check_openrouter_client.py
+"""
+import os
+import sys
+import socket
+import logging
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import requests
+
+from openrouter_service import OpenRouterClient, TokenBucket, CircuitBreaker, CircuitOpenError
+from mock_openrouter import MockConfig, start_mock_server
+
+MODEL = 'mock/model'
+PAYLOAD = {'model': MODEL, 'messages': [{'role': 'user', 'content': "Improve this bullet."}]}
+
+class FakeClock:
+    """A monotonic clock that only moves when something sleeps on it."""
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+def make_client(base_url, clock, rate=100.0, burst=100, failure_threshold=5, reset_seconds=30.0, max_retries=3):
+    """A client whose token bucket, circuit breaker and retry sleeps all run on `clock`."""
+    return OpenRouterClient(
+        base_url=base_url,
+        max_retries=max_retries,
+        rate_limiter=TokenBucket(rate, burst, clock=clock, sleep=clock.sleep),
+        circuit_breaker=CircuitBreaker(failure_threshold, reset_seconds, clock=clock),
+        sleep=clock.sleep,
+    )
+
+def check_retry_after_is_honored():
+    server = start_mock_server(MockConfig(fail_first=2, error_status=429, retry_after='2'))
+    clock = FakeClock()
+    client = make_client(server.base_url, clock)
+    try:
+        response = client.chat_completion('test-key', PAYLOAD)
+        assert response.status_code == 200, response.status_code
+        assert server.stats['requests'] == 3, server.stats
+        assert client.stats['retries'] == 2, client.stats
+        assert clock.sleeps == [2.0, 2.0], clock.sleeps
+        # A 429 proves the endpoint is up, so it does not count against the breaker.
+        assert client.circuit_breaker_for(MODEL).state == CircuitBreaker.CLOSED
+    finally:
+        client.close()
+        server.shutdown()
+
+def check_long_retry_after_gives_up():
+    server = start_mock_server(MockConfig(fail_first=1, error_status=429, retry_after='3600'))
+    clock = FakeClock()
+    client = make_client(server.base_url, clock)
+    try:
+        response = client.chat_completion('test-key', PAYLOAD)
+        assert response.status_code == 429, response.status_code
+        assert server.stats['requests'] == 1, server.stats
+        assert client.stats['retries'] == 0 and clock.sleeps == [], (client.stats, clock.sleeps)
+    finally:
+        client.close()
+        server.shutdown()
+
+def check_retries_are_bounded():
+    server = start_mock_server(MockConfig(fail_first=100, error_status=503, retry_after='0'))
+    clock = FakeClock()
+    client = make_client(server.base_url, clock, failure_threshold=100, max_retries=3)
+    try:
+        response = client.chat_completion('test-key', PAYLOAD)
+        assert response.status_code == 503, response.status_code
+        assert server.stats['requests'] == 4, server.stats
+        assert client.stats['retries'] == 3, client.stats
+    finally:
+        client.close()
+        server.shutdown()
+
+def check_circuit_breaker_opens_and_recovers():
+    server = start_mock_server(MockConfig(fail_first=100, error_status=503, retry_after='0'))
+    clock = FakeClock()
+    client = make_client(server.base_url, clock, failure_threshold=3, reset_seconds=30.0, max_retries=5)
+    breaker = client.circuit_breaker_for(MODEL)
+    try:
+        # The third 503 opens the circuit, so the fourth attempt is never sent.
+        try:
+            client.chat_completion('test-key', PAYLOAD)
+            raise AssertionError("expected CircuitOpenError")
+        except CircuitOpenError:
+            pass
+        assert server.stats['requests'] == 3, server.stats
+        assert client.stats['retries'] == 3 and client.stats['circuit_rejections'] == 1, client.stats
+        assert breaker.state == CircuitBreaker.OPEN, breaker.state
+
+        # Still open: rejected without touching the server.
+        try:
+            client.chat_completion('test-key', PAYLOAD)
+            raise AssertionError("expected CircuitOpenError")
+        except CircuitOpenError:
+            pass
+        assert server.stats['requests'] == 3, server.stats
+
+        # After the reset time a single probe goes through; it succeeds and closes the circuit.
+        clock.sleep(30.0)
+        assert breaker.state == CircuitBreaker.HALF_OPEN, breaker.state
+        server.config.fail_first = 0
+        response = client.chat_completion('test-key', PAYLOAD)
+        assert response.status_code == 200, response.status_code
+        assert server.stats['requests'] == 4, server.stats
+        assert breaker.state == CircuitBreaker.CLOSED, breaker.state
+    finally:
+        client.close()
+        server.shutdown()
+
+def check_token_bucket_paces_requests():
+    server = start_mock_server(MockConfig())
+    clock = FakeClock()
+    client = make_client(server.base_url, clock, rate=2.0, burst=2)
+    try:
+        for _ in range(5):
+            assert client.chat_completion('test-key', PAYLOAD).status_code == 200
+        # Two requests use the burst; the next three each wait half a second for a token.
+        assert clock.sleeps == [0.5, 0.5, 0.5], clock.sleeps
+        assert client.stats['rate_limit_wait_seconds'] == 1.5, client.stats
+        assert server.stats['requests'] == 5, server.stats
+    finally:
+        client.close()
+        server.shutdown()
+
+def check_refused_connection_is_retried():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    clock = FakeClock()
+    client = make_client(f"http://127.0.0.1:{port}/api/v1", clock, failure_threshold=100, max_retries=2)
+    try:
+        try:
+            client.chat_completion('test-key', PAYLOAD)
+            raise AssertionError("expected ConnectionError")
+        except requests.exceptions.ConnectionError:
+            pass
+        # Nothing was sent, so resending is safe.
+        assert client.stats['requests'] == 3 and client.stats['retries'] == 2, client.stats
+    finally:
+        client.close()
+
+CHECKS = [
+    check_retry_after_is_honored,
+    check_long_retry_after_gives_up,
+    check_retries_are_bounded,
+    check_circuit_breaker_opens_and_recovers,
+    check_token_bucket_paces_requests,
+    check_refused_connection_is_retried,
+]
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+    failed = 0
+    for check in CHECKS:
+        try:
+            check()
+        except AssertionError as e:
+            failed += 1
+            print(f"FAIL {check.__name__}: {e}")
+        else:
+            print(f"ok   {check.__name__}")
+    print(f"\n{len(CHECKS) - failed}/{len(CHECKS)} checks passed.")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Local stand-in for OpenRouter's /api/v1/chat/completions endpoint, for
+offline development, benchmarks and failure testing. No API key or network
+is needed; any bearer token is accepted.
+
+Usage (from the repository root):
+    python benchmarks/mock_openrouter.py [--port 8000] [--latency 0.3] [--error-rate 0.1]
+    OPENROUTER_BASE_URL=http://127.0.0.1:8000/api/v1 python main.py
+
+Answers are canned and picked by prompt content: ATS prompts get the ATS JSON,
+batch rewrites get one entry per job and everything else gets a short bullet
+list. Extra (substring, content) rules can be loaded with --canned rules.json,
+a JSON list of {"match": "...", "content": "..."} objects checked first.
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_SUGGESTION = (
+    "- Delivered measurable results by streamlining core workflows\n"
+    "- Collaborated across teams to ship features on schedule\n"
+    "- Improved reliability and performance of key services"
+)
+DEFAULT_ATS_RESULT = {
+    "score": 72,
+    "match_summary": "Solid overlap with the core requirements; a few keywords are missing.",
+    "strengths": ["Relevant backend experience", "Quantified achievements"],
+    "weaknesses": ["Cloud platform experience is not explicit"],
+    "keyword_suggestions": ["AWS", "CI/CD"],
+}
+
+
+class MockConfig:
+    """Behaviour of the mock server; attributes may be changed while it is running."""
+    def __init__(self, latency=0.0, jitter=0.0, stream_chunk_delay=0.01, error_rate=0.0, error_status=503,
+                 retry_after=None, fail_first=0, canned=None, seed=None, model_latency=None, failing_models=()):
+        self.latency = latency                        # seconds before the response starts
+        self.jitter = jitter                          # extra uniform random latency, seconds
+        self.stream_chunk_delay = stream_chunk_delay  # seconds between streamed words
+        self.error_rate = error_rate                  # probability of answering with error_status
+        self.error_status = error_status
+        self.retry_after = retry_after                # Retry-After header value sent with errors
+        self.fail_first = fail_first                  # the first N requests always fail
+        self.canned = list(canned or [])              # (substring, content) pairs checked first
+        self.model_latency = dict(model_latency or {})  # per-model latency overriding `latency`
+        self.failing_models = set(failing_models)     # models that always answer with error_status
+        self.random = random.Random(seed)
+
+
+class _MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping idle keep-alive connections is normal; stay quiet about it.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without TCP_NODELAY, delayed ACKs add ~40 ms.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        raw_body = self.rfile.read(length)
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            return self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+        if not self.headers.get('Authorization', '').startswith('Bearer '):
+            return self._send_json(401, {"error": {"message": "Missing bearer token."}})
+        try:
+            payload = json.loads(raw_body)
+        except json.JSONDecodeError:
+            return self._send_json(400, {"error": {"message": "Body is not valid JSON."}})
+
+        config = server.config
+        with server.lock:
+            server.stats['requests'] += 1
+            request_number = server.stats['requests']
+            model = payload.get('model')
+            fail = (request_number <= config.fail_first or model in config.failing_models
+                    or config.random.random() < config.error_rate)
+            delay = config.model_latency.get(model, config.latency)
+            delay += config.random.uniform(0, config.jitter) if config.jitter else 0.0
+        time.sleep(delay)
+
+        if fail:
+            with server.lock:
+                server.stats['errors'] += 1
+            headers = {'Retry-After': str(config.retry_after)} if config.retry_after is not None else {}
+            return self._send_json(config.error_status, {"error": {"message": "Injected mock failure."}}, headers)
+
+        prompt = "\n".join(str(m.get('content', '')) for m in payload.get('messages', []))
+        content = canned_content(prompt, config.canned)
+        if payload.get('stream'):
+            self._send_stream(content, payload.get('model'), config.stream_chunk_delay)
+        else:
+            self._send_json(200, {
+                "id": f"mock-{request_number}", "model": payload.get('model'),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            })
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, content, model, chunk_delay):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        self._write_chunk(": OPENROUTER PROCESSING\n\n")
+        words = content.split(' ')
+        for i, word in enumerate(words):
+            delta = word if i == len(words) - 1 else word + ' '
+            event = {"model": model, "choices": [{"index": 0, "delta": {"content": delta}}]}
+            self._write_chunk(f"data: {json.dumps(event)}\n\n")
+            if chunk_delay:
+                time.sleep(chunk_delay)
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text):
+        data = text.encode('utf-8')
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+
+def canned_content(prompt, canned=()):
+    """Picks the canned answer for `prompt`."""
+    for match, content in canned:
+        if match in prompt:
+            return content
+    if "Applicant Tracking System" in prompt:
+        return json.dumps(DEFAULT_ATS_RESULT)
+    if "JOBS TO REWRITE:" in prompt:
+        jobs_text = prompt.split("JOBS TO REWRITE:", 1)[1].split("REST OF THE RESUME", 1)[0]
+        try:
+            jobs = json.loads(jobs_text.strip())
+        except json.JSONDecodeError:
+            jobs = []
+        return json.dumps({"jobs": [
+            {"index": job.get('index', i), "description": f"- Rewritten achievements for {job.get('title') or 'this role'}"}
+            for i, job in enumerate(jobs)
+        ]})
+    return DEFAULT_SUGGESTION
+
+
+def start_mock_server(config=None, host='127.0.0.1', port=0):
+    """
+    Starts the mock server on a daemon thread. The returned server has `base_url`
+    (the value for OPENROUTER_BASE_URL), `config`, `stats` and shutdown().
+    """
+    server = _MockServer((host, port), _Handler)
+    server.config = config or MockConfig()
+    server.lock = threading.Lock()
+    server.stats = {'requests': 0, 'errors': 0}
+    server.base_url = f"http://{host}:{server.server_port}/api/v1"
+    threading.Thread(target=server.serve_forever, name='mock-openrouter', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.3, help="Seconds before each response starts.")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Extra uniform random latency in seconds.")
+    parser.add_argument('--chunk-delay', type=float, default=0.03, help="Seconds between streamed words.")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests that fail.")
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--retry-after', help="Retry-After header value sent with injected errors.")
+    parser.add_argument('--fail-first', type=int, default=0, help="Fail the first N requests.")
+    parser.add_argument('--canned', help="JSON file of [{\"match\": ..., \"content\": ...}] rules.")
+    parser.add_argument('--slow-model', nargs=2, action='append', default=[], metavar=('MODEL', 'SECONDS'),
+                        help="Give MODEL its own latency (repeatable), e.g. to exercise model routing.")
+    parser.add_argument('--failing-model', action='append', default=[], help="MODEL always fails (repeatable).")
+    args = parser.parse_args()
+
+    canned = []
+    if args.canned:
+        with open(args.canned, 'r', encoding='utf-8') as f:
+            canned = [(rule['match'], rule['content']) for rule in json.load(f)]
+    config = MockConfig(latency=args.latency, jitter=args.jitter, stream_chunk_delay=args.chunk_delay,
+                        error_rate=args.error_rate, error_status=args.error_status,
+                        retry_after=args.retry_after, fail_first=args.fail_first, canned=canned,
+                        model_latency={model: float(seconds) for model, seconds in args.slow_model},
+                        failing_models=args.failing_model)
+    server = start_mock_server(config, args.host, args.port)
+    print(f"Mock OpenRouter listening. Run the app with:\n    OPENROUTER_BASE_URL={server.base_url} python main.py")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"\nServed {server.stats['requests']} request(s), {server.stats['errors']} injected error(s).")
+
+if __name__ == '__main__':
+    main()
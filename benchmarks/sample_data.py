@@ -0,0 +1,23 @@
+"""Representative resume data, in the shape app.data_handler.gather_data produces."""
+
+SAMPLE_RESUME = {
+    'name': 'Jane Doe',
+    'email': 'jane.doe@example.com',
+    'phone': '+1 555 0100',
+    'linkedin': 'janedoe',
+    'sections': [
+        {'type': 'summary', 'title': 'Summary',
+         'content': 'Backend engineer with eight years of experience building data-intensive services in Python and Go.'},
+        {'type': 'experience', 'title': 'Experience', 'content': [
+            {'title': 'Senior Software Engineer', 'company': 'Acme Corp', 'location': 'Berlin', 'years': '2020 -- 2024',
+             'description': 'Led migration of billing pipeline to event sourcing\nCut p95 API latency by 40%\nMentored four engineers'},
+            {'title': 'Software Engineer', 'company': 'Globex', 'location': 'Munich', 'years': '2016 -- 2020',
+             'description': 'Built internal search service on Elasticsearch\nAutomated deployment with Terraform and Ansible'},
+        ]},
+        {'type': 'education', 'title': 'Education', 'content': [
+            {'degree': 'M.Sc. Computer Science', 'university': 'TU Munich', 'years': '2014 -- 2016'},
+        ]},
+        {'type': 'skills', 'title': 'Skills',
+         'content': 'Python, Go, PostgreSQL, Kafka, Kubernetes, Terraform'},
+    ],
+}
@@ -1,25 +1,52 @@
 import os
+import re
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
 import subprocess
 import logging
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from jinja2 import Environment, FileSystemLoader, TemplateNotFound
 
 logger = logging.getLogger()
 
-def generate_latex_resume(data, template_name, is_preview=False):
+
+_TEMPLATE_MARKERS = ('{{', '\\block{', '\\#{')
+# hyperref hooks into \begin{document} and does not survive being dumped into a format.
+_UNDUMPABLE_PACKAGES = ('hyperref',)
+
+def extract_static_preamble(template_source):
     """
-    Generates a PDF resume.
-    If is_preview is True, it overwrites a single '_preview.pdf' file.
-    If is_preview is False, it creates a new timestamped PDF file.
+    Returns the leading lines of a template that contain no template markup,
+    stopping at \\begin{document}. These render identically for every resume,
+    so they can be dumped into a precompiled format.
     """
-    logger.info(f"Starting PDF generation (Preview: {is_preview}) with template: '{template_name}'.")
-    try:
-        template_dir = os.path.abspath('templates')
-        output_dir = os.path.abspath('output')
-            
-        os.makedirs(output_dir, exist_ok=True)
-        
-        env = Environment(
+    lines = []
+    for line in template_source.splitlines(keepends=True):
+        stripped = line.lstrip()
+        if stripped.startswith(('\\begin{document}', '%%', '%#')):
+            break
+        if any(marker in line for marker in _TEMPLATE_MARKERS):
+            break
+        if stripped.startswith('\\usepackage') and any(pkg in line for pkg in _UNDUMPABLE_PACKAGES):
+            break
+        lines.append(line)
+    return ''.join(lines)
+
+
+class TemplateEngine:
+    """
+    Keeps a single Jinja environment alive and caches compiled templates.
+    A cached template is reused as long as its file's mtime/size is unchanged;
+    if only the mtime moved, the content hash decides whether to re-parse.
+    """
+    def __init__(self, template_dir):
+        self.template_dir = template_dir
+        # cache_size=0: the engine owns caching, Jinja must not keep its own copy.
+        self.env = Environment(
             loader=FileSystemLoader(template_dir),
             block_start_string='\\block{',
             block_end_string='}',
@@ -30,51 +57,785 @@ def generate_latex_resume(data, template_name, is_preview=False):
             line_statement_prefix='%%',
             line_comment_prefix='%#',
             trim_blocks=True,
-            autoescape=False
+            autoescape=False,
+            cache_size=0
         )
+        self._cache = {}  # template_name -> (stamp, content_hash, template, static_preamble)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'parse_seconds': 0.0}
+
+    def get_template(self, template_name):
+        """Returns the compiled template for `template_name`, parsing it only when the file changed."""
+        return self._load(template_name)[2]
+
+    def get_static_preamble(self, template_name):
+        """Returns the leading, data-independent part of the template's preamble."""
+        return self._load(template_name)[3]
 
+    def _load(self, template_name):
         template_path = f"{template_name}/template.tex"
-        template = env.get_template(template_path)
+        full_path = os.path.join(self.template_dir, template_name, 'template.tex')
+        try:
+            st = os.stat(full_path)
+        except OSError:
+            raise TemplateNotFound(template_path)
+        stamp = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            cached = self._cache.get(template_name)
+            if cached and cached[0] == stamp:
+                self.stats['hits'] += 1
+                return cached
+
+            with open(full_path, 'rb') as f:
+                raw = f.read()
+            content_hash = hashlib.sha256(raw).hexdigest()
+            if cached and cached[1] == content_hash:
+                # File was touched but not modified; keep the compiled template.
+                cached = (stamp,) + cached[1:]
+                self._cache[template_name] = cached
+                self.stats['hits'] += 1
+                return cached
+
+            start = time.perf_counter()
+            template = self.env.get_template(template_path)
+            elapsed = time.perf_counter() - start
+            static_preamble = extract_static_preamble(raw.decode('utf-8'))
+            entry = (stamp, content_hash, template, static_preamble)
+            self._cache[template_name] = entry
+            self.stats['misses'] += 1
+            self.stats['parse_seconds'] += elapsed
+            logger.debug(f"Compiled template '{template_name}' in {elapsed * 1000:.1f} ms.")
+            return entry
+
+    def render(self, template_name, data):
+        return self.get_template(template_name).render(data)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_template_engine():
+    """Returns the process-wide TemplateEngine for the current 'templates' directory."""
+    global _engine
+    template_dir = os.path.abspath('templates')
+    with _engine_lock:
+        if _engine is None or _engine.template_dir != template_dir:
+            _engine = TemplateEngine(template_dir)
+        return _engine
+
+def get_template_cache_stats():
+    """Returns a copy of the template cache counters (hits, misses, parse_seconds)."""
+    return dict(get_template_engine().stats)
+
+
+class PdfCache:
+    """
+    Content-addressed store of compiled PDFs, keyed on the template name plus
+    the rendered LaTeX. Entries live on disk so they survive restarts; the
+    file mtime doubles as the LRU clock and is bumped on every hit.
+    """
+    def __init__(self, cache_dir, max_entries=32):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(template_name, rendered_latex):
+        h = hashlib.sha256()
+        h.update(template_name.encode('utf-8'))
+        h.update(b'\0')
+        h.update(rendered_latex.encode('utf-8'))
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def get(self, key):
+        """Returns the cached PDF path for `key`, or None on a miss."""
+        path = self._path(key)
+        with self._lock:
+            try:
+                os.utime(path, None)
+            except OSError:
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+            return path
+
+    def put(self, key, pdf_path):
+        """Copies a freshly built PDF into the cache and enforces the size bound."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            shutil.copyfile(pdf_path, tmp_path)
+            os.replace(tmp_path, path)
+            self._evict()
+        return path
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.pdf'):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    continue
+        excess = len(entries) - self.max_entries
+        if excess <= 0:
+            return
+        entries.sort()
+        for _, path in entries[:excess]:
+            try:
+                os.remove(path)
+                self.stats['evictions'] += 1
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith('.pdf'):
+                    os.remove(entry.path)
+
+
+PDF_CACHE_MAX_ENTRIES = 32
+
+_pdf_cache = None
+_pdf_cache_lock = threading.Lock()
+
+def get_pdf_cache():
+    """Returns the process-wide PdfCache stored under 'output/.pdf_cache'."""
+    global _pdf_cache
+    cache_dir = os.path.join(os.path.abspath('output'), '.pdf_cache')
+    with _pdf_cache_lock:
+        if _pdf_cache is None or _pdf_cache.cache_dir != cache_dir:
+            _pdf_cache = PdfCache(cache_dir, max_entries=PDF_CACHE_MAX_ENTRIES)
+        return _pdf_cache
+
+
+class FormatCache:
+    """
+    Builds and caches one pdflatex format per template, dumping its static
+    preamble with mylatexformat. Format names embed a hash of the preamble, so
+    editing a template's preamble automatically triggers a rebuild.
+    """
+    def __init__(self, format_dir):
+        self.format_dir = format_dir
+        self._lock = threading.Lock()
+        self._failed = set()
+        self.stats = {'hits': 0, 'builds': 0, 'failures': 0, 'build_seconds': 0.0}
+        os.makedirs(format_dir, exist_ok=True)
+
+    def get_format(self, template_name, static_preamble, preview_generation=None):
+        """
+        Returns a format name usable with -fmt, or None if no format is available.
+        A build for `preview_generation` is killed like a preview compile when that
+        preview is superseded, raising CompileCancelled.
+        """
+        if '\\documentclass' not in static_preamble:
+            return None
+        digest = hashlib.sha256(static_preamble.encode('utf-8')).hexdigest()[:16]
+        fmt_name = f"{template_name}_{digest}"
+        fmt_path = os.path.join(self.format_dir, f"{fmt_name}.fmt")
+
+        with self._lock:
+            if os.path.exists(fmt_path):
+                self.stats['hits'] += 1
+                return fmt_name
+            if fmt_name in self._failed:
+                return None
+            if self._build(template_name, fmt_name, static_preamble, preview_generation):
+                return fmt_name
+            self._failed.add(fmt_name)
+            return None
+
+    def discard(self, fmt_name):
+        """Drops a format that turned out to be unusable."""
+        with self._lock:
+            self._failed.add(fmt_name)
+            try:
+                os.remove(os.path.join(self.format_dir, f"{fmt_name}.fmt"))
+            except OSError:
+                pass
+
+    def _build(self, template_name, fmt_name, static_preamble, preview_generation=None):
+        preamble_path = os.path.join(self.format_dir, f"{fmt_name}.tex")
+        with open(preamble_path, 'w', encoding='utf-8') as f:
+            f.write(static_preamble)
+            f.write('\\endofdump\n\\begin{document}\n\\end{document}\n')
+
+        logger.info(f"Building precompiled format for template '{template_name}'...")
+        fmt_path = os.path.join(self.format_dir, f"{fmt_name}.fmt")
+        if preview_generation is not None and not _preview_tracker.is_current(preview_generation):
+            raise CompileCancelled()
+        start = time.perf_counter()
+        try:
+            process = subprocess.Popen(
+                ['pdflatex', '-ini', '-interaction=nonstopmode', '-halt-on-error', f'-jobname={fmt_name}',
+                 '-output-directory', self.format_dir, '&pdflatex', 'mylatexformat.ltx', preamble_path],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                encoding='utf-8',
+                errors='ignore'
+            )
+        except OSError as e:
+            logger.warning(f"Could not run pdflatex to build format '{fmt_name}': {e}")
+            self.stats['failures'] += 1
+            return False
+        # Built during a preview, the format build is cancelled like the preview's own compile.
+        if preview_generation is not None and not _preview_tracker.attach(preview_generation, process):
+            process.kill()
+        try:
+            output, _ = process.communicate(timeout=COMPILE_TIMEOUT_SECONDS)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            output = None
+        finally:
+            _preview_tracker.detach(process)
+        elapsed = time.perf_counter() - start
+
+        if preview_generation is not None and not _preview_tracker.is_current(preview_generation):
+            # A killed build may have left a truncated .fmt behind.
+            try:
+                os.remove(fmt_path)
+            except OSError:
+                pass
+            raise CompileCancelled()
+        if output is None:
+            logger.warning(f"Format build for '{template_name}' did not finish within {COMPILE_TIMEOUT_SECONDS} s.")
+            self.stats['failures'] += 1
+            return False
+        if process.returncode != 0 or not os.path.exists(fmt_path):
+            logger.warning(f"Format build for '{template_name}' failed; falling back to cold compiles.")
+            logger.debug(f"pdflatex -ini output:\n{output}")
+            self.stats['failures'] += 1
+            return False
+
+        # Formats for older versions of this template's preamble are now dead weight.
+        # Match the whole name: 'moderncv_' is also a prefix of 'moderncv_1_<digest>'.
+        own_files = re.compile(rf"{re.escape(template_name)}_[0-9a-f]{{16}}\.(fmt|tex|log)")
+        for entry in os.scandir(self.format_dir):
+            if own_files.fullmatch(entry.name) and not entry.name.startswith(f"{fmt_name}."):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+        self.stats['builds'] += 1
+        self.stats['build_seconds'] += elapsed
+        logger.info(f"Built format '{fmt_name}' in {elapsed:.2f} s.")
+        return True
+
+
+USE_PRECOMPILED_FORMATS = True
+
+_format_cache = None
+_format_cache_lock = threading.Lock()
+
+def get_format_cache():
+    """Returns the process-wide FormatCache stored under 'output/.formats'."""
+    global _format_cache
+    format_dir = os.path.join(os.path.abspath('output'), '.formats')
+    with _format_cache_lock:
+        if _format_cache is None or _format_cache.format_dir != format_dir:
+            _format_cache = FormatCache(format_dir)
+        return _format_cache
+
+def prepare_format_source(template_name, rendered_latex, preview_generation=None):
+    """
+    Returns (fmt_name, source) for compiling `rendered_latex` from a precompiled
+    format, or (None, rendered_latex) if the document has to be compiled cold.
+    Raises CompileCancelled if `preview_generation` is superseded while the
+    format is being built.
+    """
+    if not USE_PRECOMPILED_FORMATS:
+        return None, rendered_latex
+    static_preamble = get_template_engine().get_static_preamble(template_name)
+    if not static_preamble or not rendered_latex.startswith(static_preamble):
+        return None, rendered_latex
+    fmt_name = get_format_cache().get_format(template_name, static_preamble, preview_generation)
+    if not fmt_name:
+        return None, rendered_latex
+    # mylatexformat skips everything up to \endofdump when started from the format.
+    return fmt_name, static_preamble + '\\endofdump\n' + rendered_latex[len(static_preamble):]
+
+# --- COMPILE CANCELLATION & TIMEOUT ---
+# Wall-clock limit for a single pdflatex process; a runaway nonstopmode run is killed.
+COMPILE_TIMEOUT_SECONDS = 60
+
+class CompileCancelled(Exception):
+    """Raised when a preview compile is superseded by a newer preview request."""
+
+
+class _PreviewTracker:
+    """
+    Tracks the pdflatex process of the current preview. Each preview gets a new
+    generation number; starting or cancelling a preview kills the process of
+    any older generation so stale previews stop burning CPU immediately.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.generation = 0
+        self._process = None
+
+    def begin(self):
+        """Starts a new preview generation, superseding any running one."""
+        with self._lock:
+            self.generation += 1
+            self._kill_locked()
+            return self.generation
+
+    def cancel(self):
+        with self._lock:
+            self.generation += 1
+            self._kill_locked()
+
+    def is_current(self, generation):
+        with self._lock:
+            return generation == self.generation
+
+    def attach(self, generation, process):
+        """Registers `process` for `generation`; returns False if it is already stale."""
+        with self._lock:
+            if generation != self.generation:
+                return False
+            self._process = process
+            return True
+
+    def detach(self, process):
+        with self._lock:
+            if self._process is process:
+                self._process = None
+
+    def _kill_locked(self):
+        if self._process is not None and self._process.poll() is None:
+            logger.info("Terminating superseded preview compile.")
+            self._process.kill()
+        self._process = None
+
+
+_preview_tracker = _PreviewTracker()
+
+def cancel_preview():
+    """Kills the in-flight preview compile, if any. Safe to call from any thread."""
+    _preview_tracker.cancel()
+
+class LatexCompileError(Exception):
+    """
+    A pdflatex failure, reduced to what a user needs: the TeX error message,
+    the line in the generated .tex (when TeX reported one) and a few lines of
+    context. The full console output is kept in `output` for debugging.
+    """
+    def __init__(self, message, line=None, context=None, output=''):
+        super().__init__(message)
+        self.message = message
+        self.line = line
+        self.context = context or []
+        self.output = output
+
+    def __str__(self):
+        location = f"line {self.line}: " if self.line is not None else ""
+        return f"{location}{self.message}"
+
+
+# Lines of TeX's error context to keep after the '! ' line before giving up on finding 'l.<n>'.
+ERROR_CONTEXT_MAX_LINES = 6
+_ERROR_LINE_PATTERN = re.compile(r'^l\.(\d+)')
+
+def run_pdflatex(tex_filepath, output_dir, fmt_name=None, preview_generation=None):
+    """
+    Runs a single pdflatex pass, optionally starting from a precompiled format.
+    With -halt-on-error TeX stops by itself at the first error; its piped output
+    is block-buffered, so the '! ' line may only show up once it exits. That
+    line and its context are raised as LatexCompileError. Also raises
+    subprocess.TimeoutExpired after COMPILE_TIMEOUT_SECONDS and CompileCancelled
+    if `preview_generation` is superseded while running.
+    """
+    command = ['pdflatex', '-interaction=nonstopmode', '-halt-on-error', '-output-directory', output_dir]
+    env = None
+    if fmt_name:
+        command.append(f'-fmt={fmt_name}')
+        # Trailing separator keeps kpathsea's default format search path.
+        env = dict(os.environ, TEXFORMATS=get_format_cache().format_dir + os.pathsep)
+    command.append(tex_filepath)
+
+    if preview_generation is not None and not _preview_tracker.is_current(preview_generation):
+        raise CompileCancelled()
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding='utf-8',
+        errors='ignore',
+        env=env
+    )
+    if preview_generation is not None and not _preview_tracker.attach(preview_generation, process):
+        process.kill()
+
+    # readline() blocks, so the wall-clock limit is enforced by a watchdog timer.
+    timed_out = threading.Event()
+    def _on_timeout():
+        timed_out.set()
+        process.kill()
+    watchdog = threading.Timer(COMPILE_TIMEOUT_SECONDS, _on_timeout)
+    watchdog.daemon = True
+    watchdog.start()
+
+    output_lines = []
+    error = None
+    try:
+        for line in process.stdout:
+            output_lines.append(line)
+            if error is None:
+                if line.startswith('! '):
+                    error = LatexCompileError(line[2:].strip())
+                continue
+            error.context.append(line.rstrip('\n'))
+            match = _ERROR_LINE_PATTERN.match(line)
+            if match:
+                error.line = int(match.group(1))
+                break
+            if len(error.context) >= ERROR_CONTEXT_MAX_LINES:
+                break
+        if error is not None:
+            # Everything after the first fatal error is noise; stop pdflatex now.
+            process.kill()
+        process.stdout.close()
+        process.wait()
+    finally:
+        watchdog.cancel()
+        _preview_tracker.detach(process)
+
+    output = ''.join(output_lines)
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(command, COMPILE_TIMEOUT_SECONDS, output=output)
+    if preview_generation is not None and not _preview_tracker.is_current(preview_generation):
+        raise CompileCancelled()
+    if error is not None:
+        error.output = output
+        raise error
+    if process.returncode != 0:
+        tail = [l.rstrip('\n') for l in output_lines[-ERROR_CONTEXT_MAX_LINES:]]
+        raise LatexCompileError(f"pdflatex exited with status {process.returncode}.", context=tail, output=output)
+    return subprocess.CompletedProcess(command, process.returncode, output, '')
+
+
+MAX_COMPILE_PASSES = 3
+
+_RERUN_PATTERN = re.compile(r'Rerun to get|Label\(s\) may have changed|Please rerun LaTeX|Rerun LaTeX')
+# Only these .aux lines feed back into the next pass (cross-references, citations,
+# TOC entries). Everything else, e.g. hyperref's \HyPL@Entry or \providecommand
+# bookkeeping, is written on every pass and would force a pointless second one.
+_AUX_REFERENCE_PREFIXES = ('\\newlabel', '\\bibcite', '\\@writefile', '\\contentsline')
+
+def aux_file_digest(aux_filepath):
+    """Hashes the reference-carrying lines of an .aux file; a missing file hashes as empty."""
+    h = hashlib.sha256()
+    try:
+        with open(aux_filepath, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                if line.startswith(_AUX_REFERENCE_PREFIXES):
+                    h.update(line.encode('utf-8'))
+    except OSError:
+        pass
+    return h.hexdigest()
+
+def _aux_seed_path(template_name):
+    return os.path.join(os.path.abspath('output'), '.aux', f"{template_name}.aux")
+
+def seed_aux_file(template_name, aux_filepath):
+    """
+    Copies the .aux of the template's last successful build into a fresh build
+    dir. Sections and page labels write the same lines on every build, so pass 1
+    then already matches them and no second pass is needed to settle.
+    """
+    try:
+        shutil.copyfile(_aux_seed_path(template_name), aux_filepath)
+    except OSError:
+        pass
+
+def save_aux_seed(template_name, aux_filepath):
+    """Keeps a successful build's .aux as the seed for the template's next build."""
+    seed_path = _aux_seed_path(template_name)
+    tmp_path = f"{seed_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(seed_path), exist_ok=True)
+        shutil.copyfile(aux_filepath, tmp_path)
+        os.replace(tmp_path, seed_path)
+    except OSError as e:
+        logger.debug(f"Could not keep .aux for template '{template_name}': {e}")
+
+def log_requests_rerun(log_filepath):
+    """Returns True if the pdflatex log contains a 'Rerun to get ...'-style warning."""
+    try:
+        with open(log_filepath, 'r', encoding='utf-8', errors='ignore') as f:
+            return bool(_RERUN_PATTERN.search(f.read()))
+    except OSError:
+        return False
+
+
+# --- SCRATCH BUILDS & OUTPUT RETENTION ---
+# Build in a RAM-backed directory (e.g. /dev/shm) so .aux/.log/.tex never touch the disk.
+USE_RAM_SCRATCH = False
+RAM_SCRATCH_CANDIDATES = ('/dev/shm', '/run/shm')
+
+# Limits for timestamped 'resume_*.pdf' files in output/. None disables a limit.
+OUTPUT_MAX_FILES = 50
+OUTPUT_MAX_AGE_DAYS = None
+OUTPUT_MAX_TOTAL_MB = None
+
+_LATEX_BYPRODUCT_EXTENSIONS = ('.aux', '.log', '.out', '.tex')
+# Scratch dirs older than this were left behind by a crash and can be removed.
+_STALE_SCRATCH_SECONDS = 3600
+
+def get_scratch_root(output_dir):
+    """Returns the directory in which per-job build directories are created."""
+    if USE_RAM_SCRATCH:
+        for candidate in RAM_SCRATCH_CANDIDATES:
+            if os.path.isdir(candidate) and os.access(candidate, os.W_OK):
+                return os.path.join(candidate, f"ai-resume-builder-{os.getuid() if hasattr(os, 'getuid') else 'user'}")
+        logger.warning("RAM-backed scratch requested but no tmpfs was found; building on disk.")
+    # Under output/ the final os.replace stays on one filesystem.
+    return os.path.join(output_dir, '.build')
+
+def move_into_place(src_path, dst_path):
+    """Atomically moves a built file to `dst_path`, copying first if it lives on another filesystem."""
+    try:
+        os.replace(src_path, dst_path)
+    except OSError:
+        tmp_path = f"{dst_path}.{threading.get_ident()}.tmp"
+        shutil.copyfile(src_path, tmp_path)
+        os.replace(tmp_path, dst_path)
+        os.remove(src_path)
+
+def enforce_output_retention(output_dir):
+    """
+    Deletes old timestamped resumes beyond OUTPUT_MAX_FILES / OUTPUT_MAX_AGE_DAYS /
+    OUTPUT_MAX_TOTAL_MB (oldest first), stray LaTeX by-products and abandoned scratch dirs.
+    """
+    now = time.time()
+    resumes = []
+    try:
+        entries = list(os.scandir(output_dir))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.name.startswith('resume_') and entry.name.endswith('.pdf'):
+                st = entry.stat()
+                resumes.append((st.st_mtime, st.st_size, entry.path))
+            elif entry.is_file() and entry.name.endswith(_LATEX_BYPRODUCT_EXTENSIONS):
+                os.remove(entry.path)
+        except OSError:
+            continue
+
+    # The RAM-backed scratch root too, and output/.build left over from before it was enabled.
+    for scratch_root in {get_scratch_root(output_dir), os.path.join(output_dir, '.build')}:
+        try:
+            scratch_entries = list(os.scandir(scratch_root))
+        except OSError:
+            continue
+        for entry in scratch_entries:
+            try:
+                if now - entry.stat().st_mtime > _STALE_SCRATCH_SECONDS:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+            except OSError:
+                continue
+
+    resumes.sort(reverse=True)  # newest first
+    keep, total_bytes, removed = [], 0, 0
+    for mtime, size, path in resumes:
+        too_many = OUTPUT_MAX_FILES is not None and len(keep) >= OUTPUT_MAX_FILES
+        too_old = OUTPUT_MAX_AGE_DAYS is not None and now - mtime > OUTPUT_MAX_AGE_DAYS * 86400
+        too_big = OUTPUT_MAX_TOTAL_MB is not None and total_bytes + size > OUTPUT_MAX_TOTAL_MB * 1024 * 1024
+        if too_many or too_old or too_big:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+            continue
+        keep.append(path)
+        total_bytes += size
+    if removed:
+        logger.info(f"Output retention removed {removed} old resume PDF(s).")
+
+
+# pdflatex's messages when a format cannot be loaded (missing, corrupt, other engine version).
+_FORMAT_LOAD_ERROR_PATTERN = re.compile(r"format file|I'm stymied")
+
+def is_format_failure(error, source):
+    """
+    True if `error`, raised compiling `source` from a format, points at the format
+    rather than the document: it failed to load, or TeX stopped at or before
+    \\endofdump, i.e. in the dumped preamble. Document errors fail the same cold.
+    """
+    if _FORMAT_LOAD_ERROR_PATTERN.search(error.output):
+        return True
+    if error.line is None:
+        return False
+    dump_line = source.count('\n', 0, source.find('\\endofdump')) + 1
+    return error.line <= dump_line
+
+def compile_latex(rendered_latex, template_name, build_dir, base_filename, preview_generation=None):
+    """
+    Compiles `rendered_latex` inside `build_dir`, which must belong to this job
+    alone. Returns the path of the built PDF inside `build_dir`, or None.
+    Raises LatexCompileError if the document does not compile.
+    """
+    tex_filepath = os.path.join(build_dir, f"{base_filename}.tex")
+    pdf_filepath = os.path.join(build_dir, f"{base_filename}.pdf")
+
+    fmt_name, source = prepare_format_source(template_name, rendered_latex, preview_generation)
+    with open(tex_filepath, 'w', encoding='utf-8') as f:
+        f.write(source)
         
-        rendered_latex = template.render(data)
+    # Keep compiling only while the .aux keeps changing or the log asks for it.
+    aux_filepath = os.path.join(build_dir, f"{base_filename}.aux")
+    log_filepath = os.path.join(build_dir, f"{base_filename}.log")
+    seed_aux_file(template_name, aux_filepath)
+    aux_digest = aux_file_digest(aux_filepath)
+    for i in range(MAX_COMPILE_PASSES):
+        try:
+            run_pdflatex(tex_filepath, build_dir, fmt_name, preview_generation)
+        except LatexCompileError as e:
+            if not fmt_name or not is_format_failure(e, source):
+                raise
+            # Retry cold in case the dumped format itself is the problem.
+            logger.warning(f"Compile from format '{fmt_name}' failed ({e}); retrying without it.")
+            failed_fmt, fmt_name = fmt_name, None
+            with open(tex_filepath, 'w', encoding='utf-8') as f:
+                f.write(rendered_latex)
+            run_pdflatex(tex_filepath, build_dir, preview_generation=preview_generation)
+            get_format_cache().discard(failed_fmt)
+
+        new_aux_digest = aux_file_digest(aux_filepath)
+        if new_aux_digest != aux_digest:
+            rerun_reason = ".aux file changed"
+        elif log_requests_rerun(log_filepath):
+            rerun_reason = "log requested a rerun"
+        else:
+            rerun_reason = None
+        aux_digest = new_aux_digest
+        if not rerun_reason:
+            logger.info(f"LaTeX output stable after {i + 1} pass(es).")
+            break
+        logger.info(f"Pass {i + 1}: {rerun_reason}; another pass is needed.")
+    else:
+        logger.warning(f"Document still unstable after {MAX_COMPILE_PASSES} passes; keeping the last output.")
+
+    if not os.path.exists(pdf_filepath):
+        logger.error("PDF file not found after successful compilation command.")
+        return None
+    save_aux_seed(template_name, aux_filepath)
+    return pdf_filepath
+
+
+def generate_latex_resume(data, template_name, is_preview=False, output_name=None):
+    """
+    Generates a PDF resume.
+    If is_preview is True, it overwrites a single '_preview.pdf' file.
+    If is_preview is False, it creates a new timestamped PDF file, or
+    '<output_name>.pdf' when an output name is given.
+    Every call compiles in its own scratch directory, so calls may run concurrently.
+    """
+    logger.info(f"Starting PDF generation (Preview: {is_preview}) with template: '{template_name}'.")
+    # A new preview supersedes (and kills) whatever preview compile is still running.
+    preview_generation = _preview_tracker.begin() if is_preview else None
+    try:
+        output_dir = os.path.abspath('output')
+            
+        os.makedirs(output_dir, exist_ok=True)
+        
+        rendered_latex = get_template_engine().render(template_name, data)
         
         # --- DYNAMIC FILENAME LOGIC ---
         if is_preview:
             base_filename = "_preview" # A consistent name for fast overwriting
+        elif output_name:
+            base_filename = output_name
         else:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             base_filename = f"resume_{timestamp}"
         # -------------------------------
         
-        tex_filepath = os.path.join(output_dir, f"{base_filename}.tex")
         pdf_filepath = os.path.join(output_dir, f"{base_filename}.pdf")
 
-        with open(tex_filepath, 'w', encoding='utf-8') as f:
-            f.write(rendered_latex)
-            
-        # Run pdflatex only once for previews to make it faster
-        compilation_runs = 1 if is_preview else 2
-        for i in range(compilation_runs):
-            process = subprocess.run(
-                ['pdflatex', '-interaction=nonstopmode', '-output-directory', output_dir, tex_filepath],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                encoding='utf-8',
-                errors='ignore'
-            )
-            if process.returncode != 0:
-                logger.error(f"LaTeX compilation failed on run {i + 1}.")
-                logger.error(f"pdflatex error output:\n---BEGIN LATEX LOG---\n{process.stdout}\n---END LATEX LOG---")
-                return None
-        
-        if os.path.exists(pdf_filepath):
-            logger.info(f"PDF generated successfully at: {pdf_filepath}")
+        # --- PDF CACHE LOOKUP ---
+        # Identical source + template always yields the same PDF, so skip pdflatex.
+        pdf_cache = get_pdf_cache()
+        cache_key = pdf_cache.make_key(template_name, rendered_latex)
+        cached_pdf = pdf_cache.get(cache_key)
+        if cached_pdf:
+            if is_preview:
+                logger.info(f"Reusing cached PDF for unchanged source: {cached_pdf}")
+                return cached_pdf
+            tmp_filepath = f"{pdf_filepath}.{threading.get_ident()}.tmp"
+            shutil.copyfile(cached_pdf, tmp_filepath)
+            os.replace(tmp_filepath, pdf_filepath)
+            logger.info(f"Reused cached build; PDF saved at: {pdf_filepath}")
             return pdf_filepath
-        else:
-            logger.error("PDF file not found after successful compilation command.")
-            return None
+        # ------------------------
+
+        builds_root = get_scratch_root(output_dir)
+        os.makedirs(builds_root, exist_ok=True)
+        build_dir = tempfile.mkdtemp(prefix=f"{base_filename}_", dir=builds_root)
+        try:
+            built_pdf = compile_latex(rendered_latex, template_name, build_dir, base_filename, preview_generation)
+            if not built_pdf:
+                return None
+            pdf_cache.put(cache_key, built_pdf)
+            move_into_place(built_pdf, pdf_filepath)
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
 
+        if not is_preview:
+            enforce_output_retention(output_dir)
+        logger.info(f"PDF generated successfully at: {pdf_filepath}")
+        return pdf_filepath
+
+    except CompileCancelled:
+        logger.info("Preview compile cancelled in favour of a newer request.")
+        return None
+    except LatexCompileError as e:
+        logger.error(f"LaTeX compilation failed: {e}")
+        if e.context:
+            logger.error("Context:\n" + "\n".join(e.context))
+        logger.debug(f"pdflatex output:\n---BEGIN LATEX LOG---\n{e.output}\n---END LATEX LOG---")
+        return None
+    except subprocess.TimeoutExpired:
+        logger.error(f"pdflatex did not finish within {COMPILE_TIMEOUT_SECONDS} s and was killed.")
+        return None
     except Exception as e:
         logger.error(f"An unexpected error occurred during PDF generation: {e}", exc_info=True)
-        return None
\ No newline at end of file
+        return None
+
+
+# --- CONCURRENT COMPILE POOL ---
+# pdflatex does the heavy lifting in its own process, so a thread per job is
+# enough to keep that many compiler processes busy in parallel.
+COMPILE_POOL_SIZE = os.cpu_count() or 1
+
+_compile_pool = None
+_compile_pool_lock = threading.Lock()
+
+def get_compile_pool(max_workers=None):
+    """
+    Returns the shared executor that bounds concurrent pdflatex jobs. The call
+    that creates it sets its size: `max_workers`, or COMPILE_POOL_SIZE.
+    """
+    global _compile_pool
+    with _compile_pool_lock:
+        if _compile_pool is None:
+            _compile_pool = ThreadPoolExecutor(max_workers=max_workers or COMPILE_POOL_SIZE,
+                                               thread_name_prefix='latex-compile')
+        return _compile_pool
@@ -1,18 +1,25 @@
 import logging
 import sys
 from PyQt6.QtWidgets import QPlainTextEdit
+from PyQt6.QtCore import QObject, pyqtSignal
+
+class _LogEmitter(QObject):
+    # Records logged from worker threads are queued onto the widget's thread.
+    message = pyqtSignal(str)
 
 class QPlainTextEditHandler(logging.Handler):
     """A custom logging handler that emits records to a QPlainTextEdit widget."""
     def __init__(self, text_widget: QPlainTextEdit):
         super().__init__()
         self.widget = text_widget
+        self._emitter = _LogEmitter()
         # Setting properties on a potentially deleted/invalid Qt object
         # can raise a RuntimeError. Guard against that and allow logging
         # to continue to file/console even if the GUI widget is gone.
         try:
             if self.widget is not None:
                 self.widget.setReadOnly(True)
+                self._emitter.message.connect(self.widget.appendPlainText)
         except RuntimeError:
             # Widget was already deleted or is otherwise invalid; detach
             self.widget = None
@@ -24,7 +31,7 @@ class QPlainTextEditHandler(logging.Handler):
         if not self.widget:
             return
         try:
-            self.widget.appendPlainText(msg)
+            self._emitter.message.emit(msg)
         except RuntimeError:
             # Widget was deleted; drop GUI logging silently.
             self.widget = None
@@ -39,7 +39,10 @@ def launch_app():
             webengine_available = False
             print("Warning: Qt WebEngine could not be initialized; preview PDF may not work.")
     
-    window = MainWindow()
+    # A project file given on the command line is opened at startup.
+    from project_store import PROJECT_EXTENSION
+    project_path = next((arg for arg in sys.argv[1:] if arg.endswith(PROJECT_EXTENSION)), None)
+    window = MainWindow(project_path)
 
     setup_logging(window.log_viewer_widget)
 
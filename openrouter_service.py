@@ -1,34 +1,734 @@
-import requests
+import os
+import time
 import json
+import random
+import hashlib
+import sqlite3
 import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+
+from prompt_context import build_resume_context
 
 logger = logging.getLogger()
 
-def get_targeted_ai_suggestion(api_key, job_role, resume_data, target_field, job_context=None):
-    """Gets a targeted AI suggestion for a single field, using the rest of the resume as context."""
-    logger.info(f"Requesting targeted AI suggestion for field: '{target_field}'.")
-    if not api_key:
-        return "Error: API key is not set."
+# Point this at a local stand-in server (e.g. http://127.0.0.1:8000/api/v1) for offline runs.
+OPENROUTER_BASE_URL = os.environ.get('OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1')
+DEFAULT_MODEL = "mistralai/mistral-7b-instruct"
+# Candidate models per task, in order of preference; the router picks the fastest healthy one.
+TASK_MODELS = {
+    'summary': [DEFAULT_MODEL, "meta-llama/llama-3.1-8b-instruct", "google/gemma-2-9b-it"],
+    'skills': [DEFAULT_MODEL, "meta-llama/llama-3.1-8b-instruct", "google/gemma-2-9b-it"],
+    'experience_description': [DEFAULT_MODEL, "meta-llama/llama-3.1-8b-instruct", "google/gemma-2-9b-it"],
+    'experience_batch': [DEFAULT_MODEL, "meta-llama/llama-3.1-8b-instruct"],
+    'ats': [DEFAULT_MODEL, "meta-llama/llama-3.1-8b-instruct"],
+}
+# Rolling window of recent calls per model used for p95 latency and error rate.
+ROUTER_WINDOW = 50
+ROUTER_MIN_SAMPLES = 5
+ROUTER_MAX_ERROR_RATE = 0.3
+# If the chosen model has not answered after this long, the next model is tried in parallel.
+HEDGING_ENABLED = True
+HEDGE_AFTER_SECONDS = 8.0
+CONNECT_TIMEOUT_SECONDS = 5
+READ_TIMEOUT_SECONDS = 90
+# Estimated-token budgets for the resume context embedded in prompts.
+PROMPT_CONTEXT_TOKEN_BUDGET = 1200
+ATS_CONTEXT_TOKEN_BUDGET = 3000
+# Retries for failures where the request was not processed: failed connects and these statuses.
+MAX_RETRIES = 3
+RETRY_STATUS_CODES = frozenset({408, 429, 502, 503, 504})
+RETRY_BACKOFF_BASE_SECONDS = 0.5
+RETRY_BACKOFF_MAX_SECONDS = 8.0
+# A Retry-After longer than this is not waited for; the response is returned as-is.
+RETRY_AFTER_MAX_SECONDS = 30.0
+# Client-side token bucket: sustained requests per second and burst size.
+RATE_LIMIT_PER_SECOND = 1.0
+RATE_LIMIT_BURST = 5
+# The circuit opens after this many consecutive failures and stays open this long.
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_SECONDS = 30.0
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without touching the network while the circuit breaker is open."""
+
+
+class ClientClosedError(requests.exceptions.ConnectionError):
+    """Raised instead of sending (or retrying) once the client has been closed."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a request may be sent."""
+    def __init__(self, rate_per_second, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Takes one token, sleeping as long as needed. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+class CircuitBreaker:
+    """
+    Closed: requests flow. After `failure_threshold` consecutive failures it
+    opens and rejects requests for `reset_seconds`; then a single half-open
+    probe decides whether it closes again or re-opens.
+    """
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold, reset_seconds, clock=time.monotonic, name="OpenRouter API"):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_request(self):
+        """Raises CircuitOpenError if the request must not be sent."""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            retry_in = max(0.0, self.reset_seconds - (self._clock() - self._opened_at))
+        raise CircuitOpenError(f"{self.name} is unavailable; not retrying for another {retry_in:.0f} s.")
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info(f"{self.name} is reachable again; circuit closed.")
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            reopen = self._probe_in_flight
+            self._probe_in_flight = False
+            if reopen or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self._opened_at = self._clock()
+                logger.warning(f"{self.name} failed {self._failures} time(s) in a row; "
+                               f"circuit open for {self.reset_seconds:.0f} s.")
+
+
+def parse_retry_after(value, now=None):
+    """Returns the delay in seconds from a Retry-After header (seconds or HTTP date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
+def _failed_before_sending(exc):
+    """
+    True if `exc` happened while connecting (timeout, refused, DNS), so the server
+    never saw the request. A dropped connection or read timeout after the body
+    was sent may still have produced a billed completion.
+    """
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(exc, requests.exceptions.ConnectionError) or isinstance(exc, (CircuitOpenError, ClientClosedError)):
+        return False
+    reason = exc.args[0] if exc.args else None
+    reason = getattr(reason, 'reason', reason)  # urllib3's MaxRetryError wraps the cause
+    # NewConnectionError (refused, DNS failure) is a ConnectTimeoutError subclass.
+    return isinstance(reason, ConnectTimeoutError)
+
+
+class OpenRouterClient:
+    """
+    Shared HTTP layer for OpenRouter calls: one keep-alive session with a
+    connection pool, explicit connect/read timeouts and per-request metrics
+    (latency and whether an existing connection was reused).
+
+    Requests pass through a client-side rate limiter and a circuit breaker per
+    model (one overloaded model must not block the others; pass `circuit_breaker`
+    to share a single breaker instead).
+    Failures where the request was not processed (failed connects, 408/429/5xx
+    gateway statuses) are retried with jittered exponential backoff, honoring
+    Retry-After.
+    """
+    def __init__(self, base_url=None, connect_timeout=None, read_timeout=None, pool_size=4,
+                 max_retries=None, backoff_base=None, rate_limiter=None, circuit_breaker=None, sleep=time.sleep):
+        self.base_url = (base_url or OPENROUTER_BASE_URL).rstrip('/')
+        self.timeout = (connect_timeout or CONNECT_TIMEOUT_SECONDS, read_timeout or READ_TIMEOUT_SECONDS)
+        self.max_retries = MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = RETRY_BACKOFF_BASE_SECONDS if backoff_base is None else backoff_base
+        self.rate_limiter = rate_limiter or TokenBucket(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+        self._shared_breaker = circuit_breaker
+        self._breakers = {}  # model -> CircuitBreaker
+        self._sleep = sleep
+        self.closed = False
+        self.session = requests.Session()
+        self._adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount('https://', self._adapter)
+        self.session.mount('http://', self._adapter)
+        self._lock = threading.Lock()
+        self.recent = deque(maxlen=200)  # per-request metric dicts, newest last
+        self.stats = {'requests': 0, 'reused_connections': 0, 'new_connections': 0, 'errors': 0, 'total_seconds': 0.0,
+                      'retries': 0, 'rate_limit_wait_seconds': 0.0, 'circuit_rejections': 0}
+
+    def _connections_opened(self):
+        # urllib3 counts every connection a pool has ever opened; no change means reuse.
+        pools = self._adapter.poolmanager.pools
+        total = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                total += pool.num_connections
+        return total
+
+    def circuit_breaker_for(self, model):
+        if self._shared_breaker is not None:
+            return self._shared_breaker
+        with self._lock:
+            breaker = self._breakers.get(model)
+            if breaker is None:
+                breaker = self._breakers[model] = CircuitBreaker(
+                    CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS, name=f"OpenRouter model '{model}'")
+            return breaker
+
+    def chat_completion(self, api_key, payload, stream=False):
+        """
+        POSTs `payload` to /chat/completions and returns the requests.Response.
+        A retryable status is returned as-is once retries are exhausted; connection
+        errors are re-raised. Raises CircuitOpenError while the model's circuit is open.
+        """
+        url = f"{self.base_url}/chat/completions"
+        breaker = self.circuit_breaker_for(payload.get('model'))
+        attempt = 0
+        while True:
+            if self.closed:
+                raise ClientClosedError("OpenRouter client is closed.")
+            try:
+                breaker.before_request()
+            except CircuitOpenError:
+                with self._lock:
+                    self.stats['circuit_rejections'] += 1
+                raise
+            waited = self.rate_limiter.acquire()
+            if waited:
+                logger.info(f"Client-side rate limit: waited {waited * 1000:.0f} ms before sending.")
+                with self._lock:
+                    self.stats['rate_limit_wait_seconds'] += waited
+
+            try:
+                response = self._send(url, api_key, payload, stream)
+            except requests.exceptions.RequestException as e:
+                breaker.record_failure()
+                # Chat completions are not idempotent: only resend if the request never left.
+                retryable = _failed_before_sending(e)
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                logger.warning(f"OpenRouter request failed ({e}); retry {attempt + 1}/{self.max_retries} in {delay:.1f} s.")
+            else:
+                status = response.status_code
+                if status >= 500:
+                    breaker.record_failure()
+                else:
+                    # 429 and other client errors still prove the endpoint is up.
+                    breaker.record_success()
+                if status not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if retry_after is not None and retry_after > RETRY_AFTER_MAX_SECONDS:
+                    logger.warning(f"OpenRouter asked to retry after {retry_after:.0f} s; giving up instead.")
+                    return response
+                delay = retry_after if retry_after is not None else self._backoff_delay(attempt)
+                logger.warning(f"OpenRouter returned HTTP {status}; retry {attempt + 1}/{self.max_retries} in {delay:.1f} s.")
+                response.close()
+
+            attempt += 1
+            with self._lock:
+                self.stats['retries'] += 1
+            self._sleep(delay)
+
+    def _backoff_delay(self, attempt):
+        # "Full jitter": uniform in [0, base * 2^attempt], capped.
+        return random.uniform(0, min(RETRY_BACKOFF_MAX_SECONDS, self.backoff_base * (2 ** attempt)))
+
+    def _send(self, url, api_key, payload, stream):
+        with self._lock:
+            opened_before = self._connections_opened()
+        start = time.perf_counter()
+        status = None
+        try:
+            response = self.session.post(
+                url,
+                headers={"Authorization": f"Bearer {api_key}"},
+                json=payload,
+                timeout=self.timeout,
+                stream=stream
+            )
+            status = response.status_code
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                reused = self._connections_opened() == opened_before
+                self._record(payload.get('model'), status, elapsed, reused)
+
+    def _record(self, model, status, elapsed, reused):
+        self.stats['requests'] += 1
+        self.stats['total_seconds'] += elapsed
+        self.stats['reused_connections' if reused else 'new_connections'] += 1
+        if status is None or status >= 400:
+            self.stats['errors'] += 1
+        self.recent.append({'model': model, 'status': status, 'seconds': elapsed, 'reused_connection': reused})
+        logger.info(f"OpenRouter request finished in {elapsed * 1000:.0f} ms "
+                    f"(status: {status}, connection {'reused' if reused else 'new'}).")
+
+    def get_metrics(self):
+        """Returns a snapshot of aggregate stats plus the most recent per-request records."""
+        with self._lock:
+            breakers = dict(self._breakers) if self._shared_breaker is None else {'*': self._shared_breaker}
+            return {'stats': dict(self.stats), 'recent': list(self.recent),
+                    'circuit_state': {model: breaker.state for model, breaker in breakers.items()}}
+
+    def close(self):
+        self.closed = True
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Returns the process-wide OpenRouterClient for the current OPENROUTER_BASE_URL."""
+    global _client
+    with _client_lock:
+        if _client is None or _client.base_url != OPENROUTER_BASE_URL.rstrip('/'):
+            if _client is not None:
+                _client.close()
+            _client = OpenRouterClient()
+        return _client
+
+
+class ResponseCache:
+    """
+    Persistent cache of AI responses in SQLite. Entries expire after their TTL
+    and the least recently used ones are evicted beyond `max_entries`, so a
+    repeated request with unchanged input is answered without the network.
+    """
+    def __init__(self, db_path, max_entries=500):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model, task, inputs):
+        """Hashes the model, task and a canonical JSON encoding of the prompt inputs."""
+        canonical = json.dumps({'model': model, 'task': task, 'inputs': inputs},
+                               sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Returns the cached value for `key`, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.stats['hits'] += 1
+            return row[0]
+
+    def put(self, key, value, ttl_seconds=None):
+        now = time.time()
+        ttl = AI_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl, now)
+            )
+            self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (now,))
+            excess = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)", (excess,)
+                )
+                self.stats['evictions'] += excess
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+
+AI_CACHE_MAX_ENTRIES = 500
+AI_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache():
+    """Returns the process-wide ResponseCache stored in 'output/.ai_cache.sqlite3'."""
+    global _response_cache
+    db_path = os.path.join(os.path.abspath('output'), '.ai_cache.sqlite3')
+    with _response_cache_lock:
+        if _response_cache is None or _response_cache.db_path != db_path:
+            _response_cache = ResponseCache(db_path, max_entries=AI_CACHE_MAX_ENTRIES)
+        return _response_cache
+
+
+class InFlightRequests:
+    """
+    Coalesces identical concurrent requests: the first caller for a key (the
+    prompt hash) sends the request, later callers block on the same Future and
+    share its result instead of paying for a duplicate call.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures = {}
+        self.stats = {'sent': 0, 'coalesced': 0}
+
+    def join(self, key):
+        """Returns (future, is_leader). The leader must call finish() exactly once."""
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                self.stats['coalesced'] += 1
+                return future, False
+            future = self._futures[key] = Future()
+            self.stats['sent'] += 1
+            return future, True
+
+    def finish(self, key, future, result=None, error=None):
+        with self._lock:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def run(self, key, fn, *args):
+        """Returns fn(*args), or the result of an identical call already in flight."""
+        future, is_leader = self.join(key)
+        if not is_leader:
+            logger.info("Identical AI request already in flight; waiting for its result.")
+            return future.result()
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result)
+        return result
+
+    def pending(self):
+        with self._lock:
+            return len(self._futures)
+
+
+_in_flight = InFlightRequests()
+
+def get_in_flight_requests():
+    """Returns the process-wide InFlightRequests registry."""
+    return _in_flight
+
+
+class OpenRouterError(Exception):
+    """Raised when a request cannot be completed (streaming API and model router)."""
+
+
+class OpenRouterRequestError(OpenRouterError):
+    """
+    HTTP 4xx other than 408/429: a bad API key, no credits or an invalid request.
+    Another model would be refused the same way, so the router does not fall
+    back, and the failure does not count against the model's health.
+    """
+
+
+def _is_client_error(status):
+    return 400 <= status < 500 and status not in (408, 429)
+
+
+class ModelRouter:
+    """
+    Chooses a model per task from TASK_MODELS using each model's rolling p95
+    latency and error rate. Models with too many recent errors go last; models
+    without enough samples rank after measured ones, in configured order.
+    call() falls back to the next model on failure and, with hedging, also
+    starts it when the first one misses the latency deadline; the first
+    successful answer wins.
+    """
+    def __init__(self, task_models=None, window=None, min_samples=None, max_error_rate=None,
+                 hedge_after=None, hedging=None):
+        self.task_models = TASK_MODELS if task_models is None else task_models
+        self.window = window or ROUTER_WINDOW
+        self.min_samples = ROUTER_MIN_SAMPLES if min_samples is None else min_samples
+        self.max_error_rate = ROUTER_MAX_ERROR_RATE if max_error_rate is None else max_error_rate
+        self.hedge_after = HEDGE_AFTER_SECONDS if hedge_after is None else hedge_after
+        self.hedging = HEDGING_ENABLED if hedging is None else hedging
+        self._samples = {}  # model -> deque of (seconds, ok)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {'calls': 0, 'hedged': 0, 'fallbacks': 0, 'served_by_backup': 0}
+
+    def models_for(self, task):
+        return list(self.task_models.get(task) or [DEFAULT_MODEL])
+
+    def record(self, model, seconds, ok):
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=self.window)).append((seconds, ok))
+
+    def model_health(self, model):
+        """Returns {'samples', 'error_rate', 'p95_seconds'} over the rolling window."""
+        with self._lock:
+            samples = list(self._samples.get(model, ()))
+        latencies = sorted(seconds for seconds, ok in samples if ok)
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else None
+        error_rate = sum(1 for _, ok in samples if not ok) / len(samples) if samples else 0.0
+        return {'samples': len(samples), 'error_rate': error_rate, 'p95_seconds': p95}
+
+    def rank(self, task):
+        """Returns the task's models, best first."""
+        def sort_key(item):
+            index, model = item
+            health = self.model_health(model)
+            measured = health['samples'] >= self.min_samples
+            unhealthy = ((measured and health['error_rate'] > self.max_error_rate)
+                         or get_client().circuit_breaker_for(model).state == CircuitBreaker.OPEN)
+            p95 = health['p95_seconds'] if measured and health['p95_seconds'] is not None else float('inf')
+            return (unhealthy, p95, index)
+        return [model for _, model in sorted(enumerate(self.models_for(task)), key=sort_key)]
+
+    def _timed(self, model, send):
+        start = time.perf_counter()
+        try:
+            result = send(model)
+        except (CircuitOpenError, ClientClosedError, OpenRouterRequestError):
+            raise  # says nothing about this model
+        except Exception:
+            self.record(model, time.perf_counter() - start, False)
+            raise
+        self.record(model, time.perf_counter() - start, True)
+        return result
+
+    def _submit(self, model, send):
+        # Daemon threads: an attempt stuck on the network must not keep the app from exiting.
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(self._timed(model, send))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name=f"model-router-{model}", daemon=True).start()
+        return future
+
+    def shutdown(self):
+        """Stops call() from starting further models (fallbacks or hedges)."""
+        self._closed = True
+
+    def call(self, task, send):
+        """
+        Returns send(model) for the best model of `task`. `send` must raise
+        OpenRouterError or a requests exception on failure. Raises OpenRouterError
+        once every model has failed.
+        """
+        ranked = self.rank(task)
+        with self._lock:
+            self.stats['calls'] += 1
+        pending, errors = {}, []
+
+        def launch():
+            if self._closed:
+                raise OpenRouterError("Shutting down; no further models are tried.")
+            model = ranked[len(pending) + len(errors)]
+            pending[self._submit(model, send)] = model
 
+        launch()
+        while pending:
+            can_hedge = self.hedging and len(pending) + len(errors) < len(ranked)
+            done, _ = wait(pending, timeout=self.hedge_after if can_hedge else None, return_when=FIRST_COMPLETED)
+            if not done:
+                logger.warning(f"'{ranked[0]}' has not answered within {self.hedge_after:.1f} s; "
+                               f"hedging with '{ranked[len(pending) + len(errors)]}'.")
+                with self._lock:
+                    self.stats['hedged'] += 1
+                launch()
+                continue
+            for future in done:
+                model = pending.pop(future)
+                try:
+                    result = future.result()
+                except OpenRouterRequestError:
+                    raise
+                except (OpenRouterError, requests.exceptions.RequestException) as e:
+                    logger.warning(f"Model '{model}' failed: {e}")
+                    errors.append(f"{model}: {e}")
+                    continue
+                if model != ranked[0]:
+                    with self._lock:
+                        self.stats['served_by_backup'] += 1
+                logger.info(f"Task '{task}' answered by '{model}'.")
+                return result
+            if not pending and len(errors) < len(ranked):
+                with self._lock:
+                    self.stats['fallbacks'] += 1
+                launch()
+        raise OpenRouterError("All models failed. " + " | ".join(errors))
+
+    def get_metrics(self):
+        """Returns routing stats plus the health of every model seen so far."""
+        with self._lock:
+            models = list(self._samples)
+            stats = dict(self.stats)
+        return {'stats': stats, 'models': {model: self.model_health(model) for model in models}}
+
+
+_router = None
+_router_lock = threading.Lock()
+
+def get_model_router():
+    """Returns the process-wide ModelRouter."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter()
+        return _router
+
+
+def shutdown_openrouter():
+    """For application exit: stops the router from trying further models and closes the HTTP session."""
+    with _router_lock:
+        router = _router
+    if router is not None:
+        router.shutdown()
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+
+
+def _models_cache_tag(task):
+    # Part of cache keys, so changing a task's model list invalidates its cached answers.
+    return ",".join(get_model_router().models_for(task))
+
+
+def _complete(api_key, task, prompt):
+    """
+    Sends one chat completion for `task` through the model router.
+    Returns (content, raw_response_text); raises OpenRouterError on failure.
+    """
+    def send(model):
+        response = get_client().chat_completion(
+            api_key,
+            {"model": model, "messages": [{"role": "user", "content": prompt}]}
+        )
+        raw_response_text = response.text
+        try:
+            response_json = response.json()
+        except ValueError:
+            raise OpenRouterError(f"API returned invalid JSON (HTTP {response.status_code}).")
+        if response.status_code >= 400 or not response_json.get('choices'):
+            error = response_json.get('error') if isinstance(response_json, dict) else None
+            message = (error or {}).get('message', 'The AI did not return any content.')
+            logger.error(f"API response did not contain valid 'choices'. Full response: {raw_response_text}")
+            if _is_client_error(response.status_code):
+                raise OpenRouterRequestError(f"HTTP {response.status_code}: {message}")
+            raise OpenRouterError(f"HTTP {response.status_code}: {message}")
+        return response_json['choices'][0]['message']['content'], raw_response_text
+
+    return get_model_router().call(task, send)
+
+
+def _suggestion_task_instruction(target_field, job_context):
+    """Returns the task text for `target_field`, or None if the field is not supported."""
     # *** MODIFICATION: Add logic for the 'skills' target_field ***
     if target_field == "summary":
-        task_instruction = "Generate a concise and impactful professional summary (2-4 sentences)."
+        return "Generate a concise and impactful professional summary (2-4 sentences)."
     elif target_field == "skills":
-        task_instruction = "Generate a comma-separated list of key technical and soft skills relevant to the target job."
+        return "Generate a comma-separated list of key technical and soft skills relevant to the target job."
     elif target_field == "experience_description" and job_context:
-        task_instruction = (f"Rewrite the work experience description for the role of '{job_context.get('title')}' "
-                            f"at '{job_context.get('company')}'. Focus on quantifiable achievements and use professional, action-oriented bullet points.")
-    else:
-        return f"Error: Invalid target field '{target_field}' for AI suggestion."
+        return (f"Rewrite the work experience description for the role of '{job_context.get('title')}' "
+                f"at '{job_context.get('company')}'. Focus on quantifiable achievements and use professional, action-oriented bullet points.")
+    return None
 
-    prompt = f"""
+def _build_suggestion_prompt(job_role, resume_context, task_instruction):
+    return f"""
     You are an expert resume writer. Based on the full resume data provided below and for the target job role of "{job_role}", perform the following task:
 
     TASK:
     {task_instruction}
 
-    FULL RESUME DATA (for context):
-    {json.dumps(resume_data, indent=2)}
+    RESUME CONTEXT (most relevant parts):
+    {resume_context}
 
     INSTRUCTIONS:
     - Your response must be ONLY the generated text for the requested field.
@@ -36,54 +736,217 @@ def get_targeted_ai_suggestion(api_key, job_role, resume_data, target_field, job
     - For experience descriptions, start each bullet point with '- '.
     """
 
+def _suggestion_context(job_role, resume_data, target_field, job_context):
+    context, _ = build_resume_context(resume_data, target_field, job_context,
+                                      focus_text=job_role, token_budget=PROMPT_CONTEXT_TOKEN_BUDGET)
+    return context
+
+def _suggestion_cache_key(job_role, resume_context, target_field, job_context):
+    # Keyed on the compacted context, so edits to parts the prompt omits keep the cache warm.
+    return ResponseCache.make_key(_models_cache_tag(target_field), target_field, {
+        'job_role': job_role, 'resume_context': resume_context, 'job_context': job_context
+    })
+
+def clean_suggestion_text(content):
+    """Strips markdown code fences and surrounding whitespace from a model answer."""
+    if "```" in content:
+        content = content.split("```")[1].strip()
+    return content.strip()
+
+
+def get_targeted_ai_suggestion(api_key, job_role, resume_data, target_field, job_context=None, use_cache=True, stream=False):
+    """
+    Gets a targeted AI suggestion for a single field, using the rest of the resume as context.
+    Set use_cache=False to force a fresh answer (the new answer still replaces the cached one).
+    With stream=True, returns the generator from stream_targeted_ai_suggestion instead of a string.
+    """
+    if stream:
+        return stream_targeted_ai_suggestion(api_key, job_role, resume_data, target_field, job_context, use_cache)
+
+    logger.info(f"Requesting targeted AI suggestion for field: '{target_field}'.")
+    if not api_key:
+        return "Error: API key is not set."
+
+    task_instruction = _suggestion_task_instruction(target_field, job_context)
+    if task_instruction is None:
+        return f"Error: Invalid target field '{target_field}' for AI suggestion."
+
+    resume_context = _suggestion_context(job_role, resume_data, target_field, job_context)
+    cache_key = _suggestion_cache_key(job_role, resume_context, target_field, job_context)
+    if use_cache:
+        cached = get_response_cache().get(cache_key)
+        if cached is not None:
+            logger.info("Returning cached AI suggestion for unchanged input.")
+            return cached
+
+    prompt = _build_suggestion_prompt(job_role, resume_context, task_instruction)
+
+    return get_in_flight_requests().run(cache_key, _fetch_targeted_suggestion, api_key, target_field, prompt, cache_key)
+
+
+def _fetch_targeted_suggestion(api_key, task, prompt, cache_key):
     try:
         logger.info("Sending targeted request to OpenRouter API...")
-        response = requests.post(
-            url="https://openrouter.ai/api/v1/chat/completions",
-            headers={"Authorization": f"Bearer {api_key}"},
-            json={"model": "mistralai/mistral-7b-instruct", "messages": [{"role": "user", "content": prompt}]}
-        )
-        response.raise_for_status()
-        
-        raw_response_text = response.text
+        content, raw_response_text = _complete(api_key, task, prompt)
         logger.info(f"Successfully received response from OpenRouter API. Raw text: {raw_response_text}")
-
-        response_json = response.json()
-        
-        if 'choices' in response_json and response_json['choices']:
-            content = response_json['choices'][0]['message']['content']
-            if "```" in content:
-                content = content.split("```")[1].strip()
-            return content.strip()
-        else:
-            error_message = response_json.get('error', {}).get('message', 'The AI did not return any content.')
-            logger.error(f"API response did not contain valid 'choices'. Full response: {raw_response_text}")
-            return f"Error: {error_message}"
-
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error connecting to OpenRouter API: {e}", exc_info=True)
-        return f"Error connecting to OpenRouter API: {e}"
-    except json.JSONDecodeError:
-        logger.error(f"Failed to decode JSON from API response. Raw text was: {raw_response_text}")
-        return f"Error: API returned invalid JSON. See logs for the raw response."
+    except OpenRouterError as e:
+        return f"Error: {e}"
     except Exception as e:
         logger.error(f"An unexpected error occurred processing the API response: {e}", exc_info=True)
         return "An unexpected error occurred. Check the application logs."
 
+    content = clean_suggestion_text(content)
+    get_response_cache().put(cache_key, content)
+    return content
+
 
-def get_ats_score_and_feedback(api_key, job_description, resume_data):
+def stream_targeted_ai_suggestion(api_key, job_role, resume_data, target_field, job_context=None, use_cache=True):
+    """
+    Streaming variant of get_targeted_ai_suggestion: yields raw text deltas as the
+    model produces them (server-sent events). Pass the joined text through
+    clean_suggestion_text for the final value. Raises OpenRouterError on failure.
+    Closing the generator early closes the HTTP stream.
+    """
+    logger.info(f"Requesting streamed AI suggestion for field: '{target_field}'.")
+    if not api_key:
+        raise OpenRouterError("API key is not set.")
+    task_instruction = _suggestion_task_instruction(target_field, job_context)
+    if task_instruction is None:
+        raise OpenRouterError(f"Invalid target field '{target_field}' for AI suggestion.")
+
+    resume_context = _suggestion_context(job_role, resume_data, target_field, job_context)
+    cache_key = _suggestion_cache_key(job_role, resume_context, target_field, job_context)
+    if use_cache:
+        cached = get_response_cache().get(cache_key)
+        if cached is not None:
+            logger.info("Returning cached AI suggestion for unchanged input.")
+            yield cached
+            return
+
+    # Streams are coalesced separately: a follower receives the finished text as one chunk.
+    stream_key = f"{cache_key}:stream"
+    future, is_leader = get_in_flight_requests().join(stream_key)
+    if not is_leader:
+        logger.info("Identical streamed AI request already in flight; waiting for its result.")
+        yield future.result()
+        return
+
+    prompt = _build_suggestion_prompt(job_role, resume_context, task_instruction)
+    try:
+        content = yield from _stream_suggestion(api_key, target_field, prompt, cache_key)
+    except BaseException as e:
+        # Includes GeneratorExit when the leader is cancelled; followers must not wait forever.
+        error = e if isinstance(e, OpenRouterError) else OpenRouterError("The shared request did not complete.")
+        get_in_flight_requests().finish(stream_key, future, error=error)
+        raise
+    get_in_flight_requests().finish(stream_key, future, content)
+
+
+def _open_stream(api_key, task, prompt):
+    """
+    Starts a streamed completion on the best model for `task`, falling back to the
+    next model if the request fails before streaming begins. Streams are not hedged.
+    Returns (response, model, started) where `started` is when that model's request began.
+    """
+    router = get_model_router()
+    errors = []
+    for model in router.rank(task):
+        start = time.perf_counter()
+        try:
+            response = get_client().chat_completion(
+                api_key,
+                {"model": model, "messages": [{"role": "user", "content": prompt}], "stream": True},
+                stream=True
+            )
+            try:
+                response.raise_for_status()
+            except requests.exceptions.HTTPError:
+                # An unread stream=True response keeps its pooled connection until closed.
+                response.close()
+                raise
+            return response, model, start
+        except CircuitOpenError as e:
+            raise OpenRouterError(f"Error connecting to OpenRouter API: {e}")
+        except requests.exceptions.RequestException as e:
+            if e.response is not None and _is_client_error(e.response.status_code):
+                raise OpenRouterRequestError(f"OpenRouter refused the request: {e}")
+            router.record(model, time.perf_counter() - start, False)
+            logger.warning(f"Could not start stream on '{model}': {e}")
+            errors.append(f"{model}: {e}")
+    raise OpenRouterError("Error connecting to OpenRouter API: " + " | ".join(errors))
+
+
+def _stream_suggestion(api_key, task, prompt, cache_key):
+    """Yields the deltas of one streamed completion and returns the cleaned full text."""
+    start = time.perf_counter()
+    response, model, model_start = _open_stream(api_key, task, prompt)
+
+    parts = []
+    try:
+        # chunk_size=None hands over data as soon as it arrives instead of waiting for 512 bytes.
+        for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+            # Blank lines separate events; lines starting with ':' are keep-alive comments.
+            if not line or line.startswith(':') or not line.startswith('data:'):
+                continue
+            data = line[len('data:'):].strip()
+            if data == '[DONE]':
+                break
+            try:
+                event = json.loads(data)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping malformed stream event: {data[:200]}")
+                continue
+            if 'error' in event:
+                message = event['error'].get('message', 'Unknown streaming error.')
+                logger.error(f"OpenRouter reported an error mid-stream: {message}")
+                get_model_router().record(model, time.perf_counter() - model_start, False)
+                raise OpenRouterError(message)
+            choices = event.get('choices') or []
+            delta = (choices[0].get('delta') or {}).get('content') if choices else None
+            if not delta:
+                continue
+            if not parts:
+                logger.info(f"Time to first token: {(time.perf_counter() - start) * 1000:.0f} ms.")
+            parts.append(delta)
+            yield delta
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Stream from OpenRouter API was interrupted: {e}", exc_info=True)
+        get_model_router().record(model, time.perf_counter() - model_start, False)
+        raise OpenRouterError(f"Stream interrupted: {e}")
+    finally:
+        response.close()
+
+    content = clean_suggestion_text(''.join(parts))
+    if not content:
+        raise OpenRouterError("The AI did not return any content.")
+    get_model_router().record(model, time.perf_counter() - model_start, True)
+    logger.info(f"Streamed suggestion from '{model}' completed in {(time.perf_counter() - start) * 1000:.0f} ms.")
+    get_response_cache().put(cache_key, content)
+    return content
+
+
+def get_ats_score_and_feedback(api_key, job_description, resume_data, use_cache=True):
     """
     Asks the AI to act as an ATS, scoring the resume against a job description.
     Returns a structured JSON string with the score, strengths, and weaknesses.
+    Set use_cache=False to force a fresh analysis.
     """
     logger.info("Requesting ATS score and feedback from AI.")
     if not api_key:
         return "Error: API key is not set."
 
-    resume_data_copy = resume_data.copy()
-    if 'name' in resume_data_copy: resume_data_copy['name'] = "Candidate"
-    if 'email' in resume_data_copy: resume_data_copy['email'] = "[REDACTED]"
-    if 'phone' in resume_data_copy: resume_data_copy['phone'] = "[REDACTED]"
+    # The compact context never includes personal details, so nothing needs redacting.
+    resume_context, _ = build_resume_context(resume_data, 'ats', focus_text=job_description,
+                                             token_budget=ATS_CONTEXT_TOKEN_BUDGET)
+
+    cache_key = ResponseCache.make_key(_models_cache_tag('ats'), 'ats', {
+        'job_description': job_description, 'resume_context': resume_context
+    })
+    if use_cache:
+        cached = get_response_cache().get(cache_key)
+        if cached is not None:
+            logger.info("Returning cached ATS analysis for unchanged input.")
+            return cached
     
     prompt = f"""
     You are a professional hiring manager and an expert Applicant Tracking System (ATS) simulator. Your task is to analyze the provided resume against the given job description.
@@ -95,7 +958,7 @@ def get_ats_score_and_feedback(api_key, job_description, resume_data):
 
     CANDIDATE'S RESUME DATA:
     ---
-    {json.dumps(resume_data_copy, indent=2)}
+    {resume_context}
     ---
 
     INSTRUCTIONS:
@@ -115,23 +978,124 @@ def get_ats_score_and_feedback(api_key, job_description, resume_data):
     }}
     """
 
+    return get_in_flight_requests().run(cache_key, _fetch_ats_feedback, api_key, prompt, cache_key)
+
+
+def _fetch_ats_feedback(api_key, prompt, cache_key):
     try:
         logger.info("Sending ATS check request to OpenRouter API...")
-        response = requests.post(
-            url="https://openrouter.ai/api/v1/chat/completions",
-            headers={"Authorization": f"Bearer {api_key}"},
-            json={"model": "mistralai/mistral-7b-instruct", "messages": [{"role": "user", "content": prompt}]}
-        )
-        response.raise_for_status()
-        
-        raw_response_text = response.text
+        _, raw_response_text = _complete(api_key, 'ats', prompt)
         logger.info(f"Successfully received ATS response from OpenRouter API.")
-
+        get_response_cache().put(cache_key, raw_response_text)
         return raw_response_text
 
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error connecting to OpenRouter API: {e}", exc_info=True)
+    except OpenRouterError as e:
         return json.dumps({"error": f"Error connecting to API: {e}"})
     except Exception as e:
         logger.error(f"An unexpected error occurred: {e}", exc_info=True)
-        return json.dumps({"error": "An unexpected error occurred. Check logs."})
\ No newline at end of file
+        return json.dumps({"error": "An unexpected error occurred. Check logs."})
+
+
+def parse_batch_rewrites(content, job_count):
+    """
+    Validates a batch-rewrite answer: a JSON object whose "jobs" array holds one
+    {"index", "description"} entry for every job index 0..job_count-1.
+    Returns the descriptions in job order, or raises ValueError.
+    """
+    if "```" in content:
+        content = content.split("```")[1]
+        if content.startswith("json"):
+            content = content[len("json"):]
+    start, end = content.find('{'), content.rfind('}')
+    if start == -1 or end <= start:
+        raise ValueError("No JSON object found in the response.")
+    payload = json.loads(content[start:end + 1])
+
+    entries = payload.get('jobs') if isinstance(payload, dict) else None
+    if not isinstance(entries, list):
+        raise ValueError("Response JSON has no 'jobs' array.")
+    descriptions = [None] * job_count
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise ValueError("Every item in 'jobs' must be an object.")
+        index, description = entry.get('index'), entry.get('description')
+        if not isinstance(index, int) or not 0 <= index < job_count:
+            raise ValueError(f"Unexpected job index: {index!r}.")
+        if not isinstance(description, str) or not description.strip():
+            raise ValueError(f"Missing description for job {index}.")
+        if descriptions[index] is not None:
+            raise ValueError(f"Duplicate entry for job {index}.")
+        descriptions[index] = description.strip()
+    missing = [i for i, d in enumerate(descriptions) if d is None]
+    if missing:
+        raise ValueError(f"No rewrite returned for job(s): {missing}.")
+    return descriptions
+
+
+def get_batch_experience_rewrites(api_key, job_role, resume_data, jobs, use_cache=True):
+    """
+    Rewrites the descriptions of all `jobs` (dicts with title/company/location/
+    years/description) in a single request with structured JSON output.
+    Returns a list of descriptions in the same order as `jobs`, or an "Error: ..." string.
+    """
+    logger.info(f"Requesting batch rewrite of {len(jobs)} job description(s).")
+    if not api_key:
+        return "Error: API key is not set."
+    if not jobs:
+        return "Error: There are no jobs to rewrite."
+
+    # The jobs are listed explicitly below, so leave experience out of the shared context.
+    other_sections = {**resume_data, 'sections': [
+        s for s in resume_data.get('sections', []) if s.get('type') != 'experience'
+    ]}
+    resume_context, _ = build_resume_context(other_sections, 'summary', focus_text=job_role,
+                                             token_budget=PROMPT_CONTEXT_TOKEN_BUDGET)
+    jobs_json = json.dumps([
+        {'index': i, 'title': job.get('title', ''), 'company': job.get('company', ''),
+         'years': job.get('years', ''), 'description': job.get('description', '')}
+        for i, job in enumerate(jobs)
+    ], ensure_ascii=False)
+
+    cache_key = ResponseCache.make_key(_models_cache_tag('experience_batch'), 'experience_batch', {
+        'job_role': job_role, 'resume_context': resume_context, 'jobs': jobs_json
+    })
+    if use_cache:
+        cached = get_response_cache().get(cache_key)
+        if cached is not None:
+            logger.info("Returning cached batch rewrite for unchanged input.")
+            return json.loads(cached)
+
+    prompt = f"""
+    You are an expert resume writer. For the target job role of "{job_role}", rewrite the description of EVERY job listed below.
+    Focus on quantifiable achievements and use professional, action-oriented bullet points, one per line, each starting with '- '.
+
+    JOBS TO REWRITE:
+    {jobs_json}
+
+    REST OF THE RESUME (for context):
+    {resume_context}
+
+    Your response MUST be a valid JSON object and nothing else, with exactly one entry per job index:
+    {{
+      "jobs": [{{"index": <integer>, "description": "<string>"}}, ...]
+    }}
+    """
+
+    return get_in_flight_requests().run(cache_key, _fetch_batch_rewrites, api_key, prompt, cache_key, len(jobs))
+
+
+def _fetch_batch_rewrites(api_key, prompt, cache_key, job_count):
+    try:
+        logger.info("Sending batch rewrite request to OpenRouter API...")
+        content, _ = _complete(api_key, 'experience_batch', prompt)
+        descriptions = parse_batch_rewrites(content, job_count)
+        get_response_cache().put(cache_key, json.dumps(descriptions, ensure_ascii=False))
+        logger.info(f"Received {len(descriptions)} rewritten job description(s) in one request.")
+        return descriptions
+
+    except OpenRouterError as e:
+        return f"Error: {e}"
+    except (ValueError, KeyError, IndexError, TypeError) as e:
+        # json.JSONDecodeError is a ValueError too.
+        logger.error(f"Batch rewrite response was invalid: {e}")
+        return f"Error: The AI returned an unusable answer ({e}). Try again."
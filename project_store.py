@@ -0,0 +1,155 @@
+"""
+Resume project files: the app.data_handler.gather_data structure in a small
+binary container.
+
+    magic b'RSMP' | format version (1 byte) | codec (1 byte) | payload
+
+The payload is minified JSON. Jobs and degrees are stored as value lists in a
+fixed field order instead of repeating their keys, and the personal details
+as one list. It is compressed with zstd when the optional `zstandard` package
+is installed, otherwise with zlib; tiny payloads are stored as is.
+"""
+import os
+import json
+import zlib
+import logging
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger()
+
+PROJECT_EXTENSION = '.resume'
+MAGIC = b'RSMP'
+FORMAT_VERSION = 1
+# 'auto' picks zstd when available, else zlib; 'zstd', 'zlib' or 'none' force a codec.
+DEFAULT_COMPRESSION = 'auto'
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+# Payloads smaller than this are not worth compressing.
+COMPRESS_MIN_BYTES = 256
+
+_CODECS = {'none': 0, 'zlib': 1, 'zstd': 2}
+_CODEC_NAMES = {v: k for k, v in _CODECS.items()}
+_PERSONAL_FIELDS = ('name', 'email', 'phone', 'linkedin')
+_ITEM_FIELDS = {
+    'experience': ('title', 'company', 'location', 'years', 'description'),
+    'education': ('degree', 'university', 'years'),
+}
+
+
+class ProjectFormatError(ValueError):
+    """The file is not a resume project, or was written by a newer version."""
+
+
+def _pack_item(fields, item):
+    # Items with exactly the expected keys become plain value lists.
+    if fields and isinstance(item, dict) and len(item) == len(fields) and all(f in item for f in fields):
+        return [item[f] for f in fields]
+    return item
+
+def _unpack_item(fields, item):
+    if isinstance(item, list):
+        if not fields or len(item) != len(fields):
+            raise ProjectFormatError("Malformed section entry.")
+        return dict(zip(fields, item))
+    return item
+
+def _pack(data):
+    sections = []
+    for section in data.get('sections', []):
+        sec_type, content = section.get('type'), section.get('content')
+        if isinstance(content, list):
+            fields = _ITEM_FIELDS.get(sec_type)
+            content = [_pack_item(fields, item) for item in content]
+        sections.append([sec_type, section.get('title', ""), content])
+    return {'p': [data.get(f, "") for f in _PERSONAL_FIELDS], 's': sections}
+
+def _unpack(payload):
+    try:
+        data = dict(zip(_PERSONAL_FIELDS, payload['p']))
+        data['sections'] = []
+        for sec_type, title, content in payload['s']:
+            if isinstance(content, list):
+                fields = _ITEM_FIELDS.get(sec_type)
+                content = [_unpack_item(fields, item) for item in content]
+            data['sections'].append({'type': sec_type, 'title': title, 'content': content})
+    except (KeyError, TypeError, ValueError) as e:
+        raise ProjectFormatError(f"Malformed project data: {e}") from e
+    return data
+
+def _resolve_codec(compression, size):
+    if compression == 'auto':
+        if size < COMPRESS_MIN_BYTES:
+            return 'none'
+        return 'zstd' if zstandard is not None else 'zlib'
+    if compression not in _CODECS:
+        raise ValueError(f"Unknown compression '{compression}'.")
+    if compression == 'zstd' and zstandard is None:
+        raise ValueError("zstd compression needs the 'zstandard' package.")
+    return compression
+
+def encode_project(data, compression=DEFAULT_COMPRESSION):
+    """Serializes a gather_data dict into project file bytes."""
+    raw = json.dumps(_pack(data), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    codec = _resolve_codec(compression, len(raw))
+    if codec == 'zstd':
+        raw = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    elif codec == 'zlib':
+        raw = zlib.compress(raw, ZLIB_LEVEL)
+    return MAGIC + bytes((FORMAT_VERSION, _CODECS[codec])) + raw
+
+def decode_project(blob):
+    """Parses project file bytes back into a gather_data dict; raises ProjectFormatError."""
+    if len(blob) < len(MAGIC) + 2 or not blob.startswith(MAGIC):
+        raise ProjectFormatError("Not a resume project file.")
+    version, codec_id = blob[len(MAGIC)], blob[len(MAGIC) + 1]
+    if version > FORMAT_VERSION:
+        raise ProjectFormatError(f"Project format v{version} is newer than this application supports (v{FORMAT_VERSION}).")
+    codec = _CODEC_NAMES.get(codec_id)
+    if codec is None:
+        raise ProjectFormatError(f"Unknown project compression codec {codec_id}.")
+    raw = blob[len(MAGIC) + 2:]
+    try:
+        if codec == 'zstd':
+            if zstandard is None:
+                raise ProjectFormatError("This project is zstd-compressed; install the 'zstandard' package to open it.")
+            raw = zstandard.ZstdDecompressor().decompress(raw)
+        elif codec == 'zlib':
+            raw = zlib.decompress(raw)
+        payload = json.loads(raw)
+    except ProjectFormatError:
+        raise
+    except Exception as e:
+        raise ProjectFormatError(f"Corrupt project file: {e}") from e
+    return _unpack(payload)
+
+def save_project(path, data, compression=DEFAULT_COMPRESSION):
+    """
+    Writes `data` (a gather_data dict) to `path` atomically. Returns the path
+    written, or None on failure.
+    """
+    try:
+        blob = encode_project(data, compression)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not save project to {path}: {e}")
+        return None
+    logger.info(f"Saved project {path} ({len(blob)} bytes, {len(data.get('sections', []))} sections).")
+    return path
+
+def load_project(path):
+    """Reads a project file into a gather_data dict. Returns None on failure."""
+    try:
+        with open(path, 'rb') as f:
+            data = decode_project(f.read())
+    except (OSError, ProjectFormatError) as e:
+        logger.error(f"Could not open project {path}: {e}")
+        return None
+    logger.info(f"Loaded project {path} ({len(data['sections'])} sections).")
+    return data
@@ -0,0 +1,130 @@
+import re
+import json
+import math
+import logging
+
+logger = logging.getLogger()
+
+# Rough, model-agnostic estimate; good enough to keep prompts inside a budget.
+CHARS_PER_TOKEN = 4
+DEFAULT_TOKEN_BUDGET = 1200
+# A block is only truncated into the budget if at least this many tokens remain.
+_MIN_PARTIAL_TOKENS = 24
+
+# Rank of each section type per target field (lower = more relevant).
+# Types not listed for a field rank after all listed ones.
+_SECTION_PRIORITY = {
+    'summary': {'experience': 0, 'skills': 1, 'education': 2, 'custom': 3, 'custom_textarea': 3, 'custom_fields': 3, 'summary': 4},
+    'skills': {'experience': 0, 'summary': 1, 'skills': 2, 'custom': 3, 'custom_textarea': 3, 'custom_fields': 3, 'education': 4},
+    'experience_description': {'skills': 1, 'summary': 2, 'experience': 3, 'custom': 4, 'custom_textarea': 4, 'custom_fields': 4, 'education': 5},
+    'ats': {'experience': 0, 'skills': 0, 'summary': 1, 'custom': 2, 'custom_textarea': 2, 'custom_fields': 2, 'education': 2},
+}
+_WORD_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+def _clean(text):
+    """Collapses runs of whitespace inside each line and drops blank lines."""
+    lines = (" ".join(line.split()) for line in (text or "").splitlines())
+    return "\n".join(line for line in lines if line)
+
+def _words(text):
+    return set(_WORD_PATTERN.findall(text.lower()))
+
+def _job_line(job, with_description=True):
+    title, company = _clean(job.get('title')), _clean(job.get('company'))
+    head = " @ ".join(part for part in (title, company) if part) or "Job"
+    details = ", ".join(part for part in (_clean(job.get('location')), _clean(job.get('years'))) if part)
+    if details:
+        head += f" ({details})"
+    description = _clean(job.get('description')) if with_description else ""
+    return f"- {head}\n  " + description.replace("\n", "\n  ") if description else f"- {head}"
+
+def _is_target_job(job, job_context):
+    return bool(job_context) and (
+        _clean(job.get('title')) == _clean(job_context.get('title')) and
+        _clean(job.get('company')) == _clean(job_context.get('company'))
+    )
+
+def _section_blocks(section, target_field, job_context):
+    """Yields (priority_offset, text) blocks for one section; empty content yields nothing."""
+    sec_type = section.get('type')
+    title = _clean(section.get('title')) or (sec_type or "Section").title()
+    content = section.get('content')
+
+    if isinstance(content, str):
+        text = _clean(content)
+        if text:
+            yield 0, f"## {title}\n{text}"
+    elif sec_type == 'experience' and isinstance(content, list):
+        for job in content:
+            if not any(_clean(v) for v in job.values()):
+                continue
+            if target_field == 'experience_description':
+                # The job being rewritten matters most; other jobs only need their headline.
+                if _is_target_job(job, job_context):
+                    yield -10, f"## Job being rewritten\n{_job_line(job)}"
+                else:
+                    yield 0, f"## {title} (other role)\n{_job_line(job, with_description=False)}"
+            else:
+                yield 0, f"## {title}\n{_job_line(job)}"
+    elif isinstance(content, list):
+        entries = []
+        for item in content:
+            values = [_clean(v) for v in item.values() if _clean(v)]
+            if values:
+                entries.append("- " + ", ".join(values))
+        if entries:
+            yield 0, f"## {title}\n" + "\n".join(entries)
+
+def build_resume_context(resume_data, target_field, job_context=None, focus_text="", token_budget=DEFAULT_TOKEN_BUDGET):
+    """
+    Compacts `resume_data` into a plain-text context for prompts: empty fields
+    and personal details are dropped, blocks are ranked by relevance to
+    `target_field` (ties broken by word overlap with `focus_text`, e.g. the job
+    role) and the least relevant ones are cut to fit `token_budget`.
+
+    Returns (context_text, stats) where stats reports estimated tokens used and
+    saved compared with the old json.dumps(resume_data, indent=2) prompt.
+    """
+    priorities = _SECTION_PRIORITY.get(target_field, _SECTION_PRIORITY['ats'])
+    fallback_priority = max(priorities.values()) + 1
+    focus_words = _words(focus_text or "")
+    if job_context:
+        focus_words |= _words(" ".join(str(v) for v in job_context.values() if v))
+
+    candidates = []
+    for section in resume_data.get('sections', []):
+        base = priorities.get(section.get('type'), fallback_priority)
+        for offset, text in _section_blocks(section, target_field, job_context):
+            overlap = len(focus_words & _words(text)) if focus_words else 0
+            candidates.append((base + offset, -overlap, len(candidates), text))
+    candidates.sort()
+
+    blocks, used, dropped = [], 0, 0
+    for _, _, _, text in candidates:
+        cost = estimate_tokens(text) + 1  # +1 for the separating newline
+        remaining = token_budget - used
+        if cost <= remaining:
+            blocks.append(text)
+            used += cost
+        elif remaining >= _MIN_PARTIAL_TOKENS and not dropped:
+            cut = text[:(remaining - 1) * CHARS_PER_TOKEN - 1].rstrip()
+            blocks.append(cut + "…")
+            used += estimate_tokens(cut) + 1
+            dropped += 1
+        else:
+            dropped += 1
+
+    context = "\n".join(blocks)
+    baseline = estimate_tokens(json.dumps(resume_data, indent=2))
+    stats = {
+        'tokens': estimate_tokens(context),
+        'baseline_tokens': baseline,
+        'saved_tokens': max(0, baseline - estimate_tokens(context)),
+        'truncated_blocks': dropped,
+    }
+    logger.info(f"Prompt context for '{target_field}': ~{stats['tokens']} tokens "
+                f"(saved ~{stats['saved_tokens']} vs. full resume JSON, {dropped} block(s) cut).")
+    return context, stats
@@ -0,0 +1,186 @@
+"""
+Typed, immutable resume model mirroring the dict produced by
+app.data_handler.gather_data:
+
+    {'name', 'email', 'phone', 'linkedin',
+     'sections': [{'type', 'title', 'content'}]}
+
+where content is a string (summary, skills, custom text), a list of job,
+degree or custom-field dicts, or None.
+
+Every node has a stable content digest built from its children's digests, so
+an unchanged section keeps its digest without being re-serialized, and two
+nodes compare equal when their digests match.
+"""
+import hashlib
+from dataclasses import dataclass, field
+
+_DIGEST_SIZE = 16
+
+
+def _digest(tag, *parts):
+    # Length-prefixed so that ("ab", "c") and ("a", "bc") never collide.
+    h = hashlib.blake2b(tag.encode('utf-8'), digest_size=_DIGEST_SIZE)
+    for part in parts:
+        data = part.encode('utf-8')
+        h.update(len(data).to_bytes(4, 'little'))
+        h.update(data)
+    return h.hexdigest()
+
+
+class _Node:
+    """Digest-based equality and hashing shared by all model types."""
+    __slots__ = ()
+
+    def __eq__(self, other):
+        if type(self) is not type(other):
+            return NotImplemented
+        return self is other or self.digest == other.digest
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def _cached_digest(self, compute):
+        value = self._digest
+        if value is None:
+            value = compute()
+            object.__setattr__(self, '_digest', value)
+        return value
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Personal(_Node):
+    name: str = ""
+    email: str = ""
+    phone: str = ""
+    linkedin: str = ""
+    _digest: str = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def digest(self):
+        return self._cached_digest(lambda: _digest('personal', self.name, self.email, self.phone, self.linkedin))
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Job(_Node):
+    title: str = ""
+    company: str = ""
+    location: str = ""
+    years: str = ""
+    description: str = ""
+    _digest: str = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def digest(self):
+        return self._cached_digest(lambda: _digest(
+            'job', self.title, self.company, self.location, self.years, self.description))
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d.get('title', ""), d.get('company', ""), d.get('location', ""),
+                   d.get('years', ""), d.get('description', ""))
+
+    def to_dict(self):
+        return {'title': self.title, 'company': self.company, 'location': self.location,
+                'years': self.years, 'description': self.description}
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Degree(_Node):
+    degree: str = ""
+    university: str = ""
+    years: str = ""
+    _digest: str = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def digest(self):
+        return self._cached_digest(lambda: _digest('degree', self.degree, self.university, self.years))
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d.get('degree', ""), d.get('university', ""), d.get('years', ""))
+
+    def to_dict(self):
+        return {'degree': self.degree, 'university': self.university, 'years': self.years}
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class CustomItem(_Node):
+    """One entry of a custom field-based section: ordered (key, value) pairs."""
+    fields: tuple = ()
+    _digest: str = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def digest(self):
+        return self._cached_digest(lambda: _digest('custom_item', *(p for pair in self.fields for p in pair)))
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(tuple((str(k), str(v)) for k, v in d.items()))
+
+    def to_dict(self):
+        return dict(self.fields)
+
+
+_ITEM_TYPES = {'experience': Job, 'education': Degree}
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Section(_Node):
+    """`content` is a str, a tuple of Job/Degree/CustomItem, or None."""
+    type: str = None
+    title: str = ""
+    content: object = None
+    _digest: str = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def digest(self):
+        def compute():
+            if isinstance(self.content, tuple):
+                return _digest('section', self.type or "", self.title, 'items', *(i.digest for i in self.content))
+            kind = 'none' if self.content is None else 'text'
+            return _digest('section', self.type or "", self.title, kind, self.content or "")
+        return self._cached_digest(compute)
+
+    @classmethod
+    def from_dict(cls, d):
+        content = d.get('content')
+        if isinstance(content, list):
+            item_type = _ITEM_TYPES.get(d.get('type'), CustomItem)
+            content = tuple(item_type.from_dict(item) for item in content)
+        return cls(d.get('type'), d.get('title', ""), content)
+
+    def to_dict(self):
+        content = self.content
+        if isinstance(content, tuple):
+            content = [item.to_dict() for item in content]
+        return {'type': self.type, 'title': self.title, 'content': content}
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Resume(_Node):
+    personal: Personal = field(default_factory=Personal)
+    sections: tuple = ()
+    _digest: str = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def digest(self):
+        return self._cached_digest(lambda: _digest(
+            'resume', self.personal.digest, *(s.digest for s in self.sections)))
+
+    @classmethod
+    def from_dict(cls, d):
+        personal = Personal(d.get('name', ""), d.get('email', ""), d.get('phone', ""), d.get('linkedin', ""))
+        return cls(personal, tuple(Section.from_dict(s) for s in d.get('sections', [])))
+
+    def to_dict(self):
+        """Returns the gather_data-shaped dict (fresh containers, safe to mutate)."""
+        p = self.personal
+        return {'name': p.name, 'email': p.email, 'phone': p.phone, 'linkedin': p.linkedin,
+                'sections': [s.to_dict() for s in self.sections]}
+
+    def changed_sections(self, other):
+        """Indexes of sections whose digest differs from the same position in `other`."""
+        previous = other.sections if other is not None else ()
+        return [i for i, section in enumerate(self.sections)
+                if i >= len(previous) or previous[i].digest != section.digest]
@@ -12,6 +12,7 @@ setup(
     install_requires=[
         'Jinja2',
         'requests',
+        'numpy',
     ],
     
     entry_points={